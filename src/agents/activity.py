@@ -0,0 +1,137 @@
+"""
+Recent Activity Batches
+Columnar (struct-of-arrays) view of an entity's recent log events
+"""
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.agents.ipv4 import pack_ipv4, unpack_ipv4
+
+
+def _encode(values: List[Optional[str]]) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """
+    Dictionary-encode a string column
+
+    Code 0 is reserved for "missing"; labels[code - 1] is the string.
+    """
+    vocab: Dict[str, int] = {}
+    codes = np.fromiter(
+        (vocab.setdefault(v, len(vocab) + 1) if v is not None else 0 for v in values),
+        dtype=np.uint32,
+        count=len(values)
+    )
+    return codes, tuple(vocab)
+
+
+@dataclass(slots=True, frozen=True)
+class RecentActivityEvent:
+    """One row of a RecentActivityBatch"""
+    timestamp: str
+    action: Optional[str] = None
+    ip: Optional[str] = None
+    country: Optional[str] = None
+    endpoint: Optional[str] = None
+    status: Optional[int] = None
+
+
+@dataclass
+class RecentActivityBatch:
+    """
+    Recent log events for one entity, one NumPy array per field
+
+    Scans over a single field (all timestamps, all IPs) walk one
+    contiguous array instead of chasing a dict per event, and filters
+    become vectorized comparisons, e.g.
+    `batch.timestamps[batch.action_mask("login_success")]`.
+
+    Category columns hold dictionary codes into the matching `*_labels`
+    tuple (0 = field absent); IPs are packed IPv4 (NO_IP = absent).
+    """
+    timestamps: np.ndarray  # datetime64[ns]
+    actions: np.ndarray  # uint32 codes into action_labels
+    ips: np.ndarray  # uint32 packed IPv4
+    countries: np.ndarray  # uint32 codes into country_labels
+    endpoints: np.ndarray  # uint32 codes into endpoint_labels
+    statuses: np.ndarray  # uint16 HTTP status, 0 = none
+    action_labels: Tuple[str, ...] = ()
+    country_labels: Tuple[str, ...] = ()
+    endpoint_labels: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "RecentActivityBatch":
+        """Convert log rows (DB cursor or list of dicts) in a single pass per column"""
+        records = list(records)
+        n = len(records)
+
+        actions, action_labels = _encode([r.get("action") for r in records])
+        countries, country_labels = _encode([r.get("country") for r in records])
+        endpoints, endpoint_labels = _encode([r.get("endpoint") for r in records])
+
+        return cls(
+            timestamps=np.fromiter(
+                (r["timestamp"] for r in records), dtype="datetime64[ns]", count=n
+            ),
+            actions=actions,
+            ips=np.fromiter((pack_ipv4(r.get("ip")) for r in records), dtype=np.uint32, count=n),
+            countries=countries,
+            endpoints=endpoints,
+            statuses=np.fromiter((r.get("status") or 0 for r in records), dtype=np.uint16, count=n),
+            action_labels=action_labels,
+            country_labels=country_labels,
+            endpoint_labels=endpoint_labels
+        )
+
+    @classmethod
+    def empty(cls) -> "RecentActivityBatch":
+        return cls.from_records([])
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def action_mask(self, action: str) -> np.ndarray:
+        """Boolean mask of events with the given action"""
+        return self._label_mask(self.actions, self.action_labels, action)
+
+    def country_mask(self, country: str) -> np.ndarray:
+        """Boolean mask of events from the given country"""
+        return self._label_mask(self.countries, self.country_labels, country)
+
+    def hours(self) -> np.ndarray:
+        """Hour of day (0-23) of each event"""
+        return (self.timestamps - self.timestamps.astype("datetime64[D]")).astype("timedelta64[h]").astype(np.uint32)
+
+    def outside_hours(self, typical_hours_mask: int) -> np.ndarray:
+        """Boolean mask of events outside a profile's typical_hours_mask"""
+        return ((np.uint32(typical_hours_mask) >> self.hours()) & 1) == 0
+
+    @staticmethod
+    def _label_mask(codes: np.ndarray, labels: Tuple[str, ...], value: str) -> np.ndarray:
+        try:
+            code = labels.index(value) + 1
+        except ValueError:
+            return np.zeros(len(codes), dtype=bool)
+        return codes == code
+
+    def to_records(self) -> List[Dict]:
+        """Row-oriented dicts for JSON, omitting absent fields"""
+        return [
+            {k: v for k, v in asdict(event).items() if v is not None}
+            for event in self
+        ]
+
+    def __iter__(self) -> Iterator[RecentActivityEvent]:
+        for i in range(len(self)):
+            yield RecentActivityEvent(
+                timestamp=str(self.timestamps[i].astype("datetime64[us]")),
+                action=self._label(self.action_labels, self.actions[i]),
+                ip=unpack_ipv4(self.ips[i]),
+                country=self._label(self.country_labels, self.countries[i]),
+                endpoint=self._label(self.endpoint_labels, self.endpoints[i]),
+                status=int(self.statuses[i]) or None
+            )
+
+    @staticmethod
+    def _label(labels: Tuple[str, ...], code) -> Optional[str]:
+        return labels[code - 1] if code else None
@@ -0,0 +1,105 @@
+"""
+Agent Caches
+In-process LRU + TTL caching for repeated context lookups
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+import asyncio
+import functools
+import time
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a fixed time-to-live
+
+    Alert storms hit the same user/IP many times in a few seconds
+    (credential stuffing is one user, one IP, hundreds of alerts), so
+    even a short TTL removes most of the repeated backend lookups.
+
+    Also tracks in-flight fills so concurrent identical lookups share one
+    backend call instead of racing to populate the same key.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self.inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value (refreshing LRU position) or default if absent/expired"""
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self._timer():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        """Insert value, evicting least recently used entries beyond maxsize"""
+        self._data[key] = (self._timer() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > self._timer()
+
+
+def cached_lookup(cache_attr: str):
+    """
+    Memoize a single-argument async method in the TTLCache at self.<cache_attr>
+
+    Concurrent calls for a key that is already being fetched await the
+    same task rather than issuing a duplicate query.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, key):
+            cache: TTLCache = getattr(self, cache_attr)
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+            task = cache.inflight.get(key)
+            if task is None:
+                async def fill():
+                    result = await method(self, key)
+                    cache.set(key, result)
+                    return result
+
+                task = asyncio.ensure_future(fill())
+                cache.inflight[key] = task
+                task.add_done_callback(lambda _: cache.inflight.pop(key, None))
+            else:
+                # Joined an in-flight fill: counts as a hit, not a backend call
+                cache.misses -= 1
+                cache.hits += 1
+
+            # Shield so one cancelled caller doesn't cancel the shared fill
+            return await asyncio.shield(task)
+
+        return wrapper
+
+    return decorator
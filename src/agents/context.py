@@ -2,20 +2,120 @@
 Context Agent
 Enriches alerts with relevant user profile, historical data, and threat intel
 """
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from dataclasses import dataclass, fields
+from typing import FrozenSet, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
+import asyncio
 import json
+import os
+import time
 
+import orjson
 
-@dataclass
+from src.agents.activity import RecentActivityBatch
+from src.agents.cache import TTLCache, cached_lookup
+from src.agents.embedding import embed_signals
+from src.agents.threat_intel import IPBlocklist
+from src.agents.vector_search import BatchingVectorSearcher
+from src.detection.rules import hours_mask
+
+
+@dataclass(slots=True, frozen=True)
+class SimilarIncident:
+    """Past alert returned by similar-incident search"""
+    alert_id: str
+    timestamp: str
+    threat_type: str
+    confidence: int
+    outcome: str  # true_positive / false_positive
+    analyst_notes: str
+    similarity_score: float
+    
+    @classmethod
+    def from_hit(cls, hit: Dict) -> "SimilarIncident":
+        """Build from a vector DB hit, ignoring payload keys we don't model"""
+        return cls(**{name: hit[name] for name in _SIMILAR_INCIDENT_FIELDS})
+
+
+_SIMILAR_INCIDENT_FIELDS = tuple(f.name for f in fields(SimilarIncident))
+
+
+@dataclass(slots=True, frozen=True)
+class ThreatIntel:
+    """Reputation data for an IP; immutable so cached copies can be shared"""
+    ip: str
+    reputation: str  # low_risk, medium_risk, high_risk, known_malicious
+    on_blocklist: bool
+    abuse_reports_30d: int
+    known_vpn: bool
+    tor_exit_node: bool
+    hosting_provider: Optional[str]
+    geolocation: Dict[str, str]
+    known_patterns: Tuple[str, ...] = ()  # e.g., ("credential_stuffing_2024",)
+    abuse_confidence_score: Optional[int] = None  # AbuseIPDB, when configured
+    virustotal_malicious_votes: Optional[int] = None  # VirusTotal, when configured
+
+
+@dataclass(slots=True, frozen=True)
+class UserProfile:
+    """
+    Behavioral baseline for a user; immutable so cached profiles can be shared
+    
+    Defaults are the mock baseline used until the user database is wired up.
+    """
+    user_id: str
+    last_login: Optional[str] = None
+    account_age_days: int = 180
+    role: str = "user"
+    typical_countries: Tuple[str, ...] = ("US", "CA")
+    typical_hours: FrozenSet[int] = frozenset(range(9, 18))  # 9am - 6pm
+    typical_hours_mask: int = hours_mask(range(9, 18))  # Same hours, bit h = hour h
+    typical_endpoints: Tuple[str, ...] = (
+        "/api/v1/users/me",
+        "/api/v1/documents",
+        "/api/v1/search"
+    )
+    average_requests_per_day: int = 150
+    previous_alerts: int = 0
+    mfa_enabled: bool = True
+    account_tier: str = "premium"
+
+
+@dataclass(slots=True)
 class EnrichedContext:
     """Context data provided to reasoning agent"""
-    user_profile: Dict
-    similar_incidents: List[Dict]
-    threat_intelligence: Dict
-    recent_activity: List[Dict]
+    user_profile: Optional[UserProfile]  # None when the alert has no user
+    similar_incidents: List[SimilarIncident]
+    threat_intelligence: Optional[ThreatIntel]  # None when the alert has no IP
+    recent_activity: RecentActivityBatch
     concurrent_alerts: List[Dict]
+    
+    def to_json(self) -> bytes:
+        """
+        Serialize for the API boundary without an intermediate asdict()
+        
+        orjson walks the (slotted) dataclasses natively; recent activity
+        is emitted column-wise straight from its NumPy arrays.
+        """
+        return orjson.dumps(self, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _json_default(obj):
+    # Profile values orjson doesn't know about
+    if isinstance(obj, (frozenset, set)):
+        return sorted(obj)
+    if isinstance(obj, range):
+        return list(obj)
+    raise TypeError
+
+
+VIRUSTOTAL_IP_URL = "https://www.virustotal.com/api/v3/ip_addresses/{ip}"
+ABUSEIPDB_CHECK_URL = "https://api.abuseipdb.com/api/v2/check"
+
+
+async def _resolved(value):
+    """Awaitable placeholder for lookups skipped due to a missing entity"""
+    return value
 
 
 class ContextAgent:
@@ -30,14 +130,72 @@ class ContextAgent:
     5. Find concurrent alerts on same entity
     """
     
-    def __init__(self, storage_client):
+    def __init__(
+        self,
+        storage_client,
+        blocklist: Optional[IPBlocklist] = None,
+        virustotal_api_key: Optional[str] = None,
+        abuseipdb_api_key: Optional[str] = None,
+        embedder=embed_signals
+    ):
         """
         Args:
             storage_client: Interface to databases (Postgres + Vector DB)
+            blocklist: Internal IP blocklist, loaded once at startup
+            virustotal_api_key / abuseipdb_api_key: External intel vendors;
+                without both, vendor lookups are skipped (demo mode)
+            embedder: signals -> vector for similar-incident search; e.g.
+                embedding.OnnxSignalEmbedder for the quantized sentence model
         """
         self.storage = storage_client
+        self.blocklist = blocklist if blocklist is not None else IPBlocklist()
+        self.virustotal_api_key = virustotal_api_key or os.getenv("VIRUSTOTAL_API_KEY")
+        self.abuseipdb_api_key = abuseipdb_api_key or os.getenv("ABUSEIPDB_API_KEY")
+        self._http = None  # Shared pooled client, created on first vendor call
+        
+        # Alert bursts repeat the same user/IP lookups; profiles change
+        # slowly and IP reputation even more slowly
+        self.profile_cache = TTLCache(maxsize=10_000, ttl=300)
+        self.intel_cache = TTLCache(maxsize=100_000, ttl=3600)
+        
+        self.embedder = embedder
+        self.vector_searcher = BatchingVectorSearcher(storage_client)
+        
+        self._last_login = ""
+        self._last_login_expires = 0.0
     
-    def enrich(self, alert) -> EnrichedContext:
+    @property
+    def http(self):
+        """
+        Pooled HTTP/2 client shared by every vendor lookup
+        
+        Reusing keep-alive connections skips a TCP + TLS handshake per
+        alert, and HTTP/2 multiplexes concurrent lookups to the same
+        vendor over one connection.
+        """
+        if self._http is None:
+            import httpx  # Only needed when vendor keys are configured
+            self._http = httpx.AsyncClient(
+                http2=True,
+                timeout=2.0,
+                limits=httpx.Limits(max_connections=200, max_keepalive_connections=100)
+            )
+        return self._http
+    
+    async def aclose(self):
+        """Release pooled connections; call on shutdown"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters for the lookup caches"""
+        return {
+            "user_profile": self.profile_cache.stats(),
+            "threat_intelligence": self.intel_cache.stats(),
+        }
+    
+    async def enrich(self, alert) -> EnrichedContext:
         """
         Gather all relevant context for an alert
         
@@ -45,24 +203,32 @@ class ContextAgent:
         - Querying multiple databases
         - Correlating data from different sources
         - Formatting for human consumption
+        
+        The five lookups are independent I/O (Postgres, Qdrant, external
+        threat feeds), so they run concurrently: total latency is the
+        slowest single query rather than the sum of all five.
         """
         user_id = alert.affected_entities.get("user_id")
         ip = alert.affected_entities.get("ip")
         
-        # 1. Fetch user profile
-        user_profile = self._get_user_profile(user_id) if user_id else {}
-        
-        # 2. Find similar past incidents
-        similar_incidents = self._query_similar_incidents(alert)
-        
-        # 3. Check threat intelligence
-        threat_intel = self._check_threat_intelligence(ip) if ip else {}
-        
-        # 4. Get recent activity
-        recent_activity = self._get_recent_activity(user_id) if user_id else []
-        
-        # 5. Find concurrent alerts
-        concurrent = self._get_concurrent_alerts(user_id, ip)
+        (
+            user_profile,
+            similar_incidents,
+            threat_intel,
+            recent_activity,
+            concurrent,
+        ) = await asyncio.gather(
+            # 1. Fetch user profile
+            self._get_user_profile(user_id) if user_id else _resolved(None),
+            # 2. Find similar past incidents
+            self._query_similar_incidents(alert),
+            # 3. Check threat intelligence
+            self._check_threat_intelligence(ip) if ip else _resolved(None),
+            # 4. Get recent activity
+            self._get_recent_activity(user_id) if user_id else _resolved(RecentActivityBatch.empty()),
+            # 5. Find concurrent alerts
+            self._get_concurrent_alerts(user_id, ip),
+        )
         
         return EnrichedContext(
             user_profile=user_profile,
@@ -72,7 +238,16 @@ class ContextAgent:
             concurrent_alerts=concurrent
         )
     
-    def _get_user_profile(self, user_id: str) -> Dict:
+    def _cached_last_login(self) -> str:
+        """Mock last-login timestamp, recomputed at most once a minute"""
+        now = time.monotonic()
+        if now >= self._last_login_expires:
+            self._last_login = (datetime.now() - timedelta(hours=2)).isoformat()
+            self._last_login_expires = now + 60
+        return self._last_login
+    
+    @cached_lookup("profile_cache")
+    async def _get_user_profile(self, user_id: str) -> UserProfile:
         """
         Build behavioral baseline for user
         
@@ -82,29 +257,11 @@ class ContextAgent:
         - Previous alert history
         """
         # Mock implementation
-        # In production: profile = self.storage.query_user_profile(user_id)
-        
-        profile = {
-            "user_id": user_id,
-            "account_age_days": 180,
-            "role": "user",
-            "typical_countries": ["US", "CA"],
-            "typical_hours": range(9, 18),  # 9am - 6pm
-            "typical_endpoints": [
-                "/api/v1/users/me",
-                "/api/v1/documents",
-                "/api/v1/search"
-            ],
-            "average_requests_per_day": 150,
-            "previous_alerts": 0,
-            "last_login": (datetime.now() - timedelta(hours=2)).isoformat(),
-            "mfa_enabled": True,
-            "account_tier": "premium"
-        }
+        # In production: profile = await self.storage.query_user_profile(user_id)
         
-        return profile
+        return UserProfile(user_id=user_id, last_login=self._cached_last_login())
     
-    def _query_similar_incidents(self, alert) -> List[Dict]:
+    async def _query_similar_incidents(self, alert) -> List[SimilarIncident]:
         """
         Find past alerts with similar characteristics
         
@@ -114,39 +271,22 @@ class ContextAgent:
         - Same affected entity type
         
         This helps answer: "Have we seen this before?"
-        """
-        # In production: Use Qdrant or similar vector DB
-        # similar = self.storage.vector_search(
-        #     query_embedding=embed(alert.signals),
-        #     filter={"threat_type": alert.threat_type},
-        #     limit=5
-        # )
         
-        # Mock response
-        similar = [
-            {
-                "alert_id": "LOGIN-12345",
-                "timestamp": "2024-01-03T14:22:00",
-                "threat_type": "suspicious_login",
-                "confidence": 75,
-                "outcome": "false_positive",
-                "analyst_notes": "User traveling for work, verified via Slack",
-                "similarity_score": 0.85
-            },
-            {
-                "alert_id": "LOGIN-12389",
-                "timestamp": "2024-01-02T09:15:00",
-                "threat_type": "suspicious_login",
-                "confidence": 92,
-                "outcome": "true_positive",
-                "analyst_notes": "Confirmed credential stuffing attack, IP blocked",
-                "similarity_score": 0.78
+        Queries from concurrent investigations are coalesced into one
+        search_batch request by the vector searcher.
+        """
+        hits = await self.vector_searcher.query(
+            self.embedder(alert.signals),
+            filter={
+                "must": [
+                    {"key": "threat_type", "match": {"value": alert.threat_type.value}}
+                ]
             }
-        ]
-        
-        return similar
+        )
+        return [SimilarIncident.from_hit(hit) for hit in hits]
     
-    def _check_threat_intelligence(self, ip: str) -> Dict:
+    @cached_lookup("intel_cache")
+    async def _check_threat_intelligence(self, ip: str) -> ThreatIntel:
         """
         Check IP against threat intelligence feeds
         
@@ -157,18 +297,26 @@ class ContextAgent:
         - Custom threat feeds
         """
         # In production:
-        # intel = {
-        #     "ip": ip,
-        #     "reputation": self.storage.check_ip_reputation(ip),
-        #     "abuse_reports": self.external_api.query_abuseipdb(ip),
-        #     "known_campaigns": self.storage.check_attack_campaigns(ip)
-        # }
+        # intel = ThreatIntel(
+        #     ip=ip,
+        #     reputation=await self.storage.check_ip_reputation(ip),
+        #     known_patterns=await self.storage.check_attack_campaigns(ip),
+        #     **await self._query_intel_vendors(ip),
+        #     ...
+        # )
+        
+        # One packed-int set probe; exact, so no false positives to confirm
+        on_blocklist = ip in self.blocklist
+        
+        vendor_intel = {}
+        if self.virustotal_api_key and self.abuseipdb_api_key:
+            vendor_intel = await self._query_intel_vendors(ip)
         
         # Mock implementation
         intel = {
             "ip": ip,
-            "reputation": "low_risk",  # low_risk, medium_risk, high_risk, known_malicious
-            "on_blocklist": False,
+            "reputation": "known_malicious" if on_blocklist else "low_risk",
+            "on_blocklist": on_blocklist,
             "abuse_reports_30d": 0,
             "known_vpn": False,
             "tor_exit_node": False,
@@ -178,19 +326,52 @@ class ContextAgent:
                 "city": "Seattle",
                 "asn": "AS16509"
             },
-            "known_patterns": []  # e.g., ["credential_stuffing_2024"]
+            "known_patterns": ()
         }
+        intel.update(vendor_intel)
+        
+        return ThreatIntel(**intel)
+    
+    async def _query_intel_vendors(self, ip: str) -> Dict:
+        """
+        Query VirusTotal and AbuseIPDB concurrently over the pooled client
+        """
+        vt_response, abuse_response = await asyncio.gather(
+            self.http.get(
+                VIRUSTOTAL_IP_URL.format(ip=ip),
+                headers={"x-apikey": self.virustotal_api_key}
+            ),
+            self.http.get(
+                ABUSEIPDB_CHECK_URL,
+                params={"ipAddress": ip, "maxAgeInDays": 30},
+                headers={"Key": self.abuseipdb_api_key, "Accept": "application/json"}
+            ),
+        )
+        vt_response.raise_for_status()
+        abuse_response.raise_for_status()
+        
+        vt_stats = vt_response.json()["data"]["attributes"]["last_analysis_stats"]
+        abuse = abuse_response.json()["data"]
         
-        return intel
+        return {
+            "abuse_reports_30d": abuse.get("totalReports", 0),
+            "abuse_confidence_score": abuse.get("abuseConfidenceScore", 0),
+            "tor_exit_node": abuse.get("isTor", False),
+            "virustotal_malicious_votes": vt_stats.get("malicious", 0),
+        }
     
-    def _get_recent_activity(self, user_id: str, limit: int = 100) -> List[Dict]:
+    async def _get_recent_activity(self, user_id: str, limit: int = 100) -> RecentActivityBatch:
         """
         Fetch recent logs for user to understand context
         
         What was the user doing before this alert?
         Is there a pattern of escalating behavior?
+        
+        Returned as columns so downstream scans and filters are
+        vectorized rather than a loop over dicts.
         """
-        # In production: logs = self.storage.query_logs(user_id, limit=limit)
+        # In production:
+        # return RecentActivityBatch.from_records(await self.storage.query_logs(user_id, limit=limit))
         
         # Mock recent activity
         recent = [
@@ -214,9 +395,9 @@ class ContextAgent:
             }
         ]
         
-        return recent
+        return RecentActivityBatch.from_records(recent)
     
-    def _get_concurrent_alerts(
+    async def _get_concurrent_alerts(
         self,
         user_id: Optional[str],
         ip: Optional[str]
@@ -229,7 +410,7 @@ class ContextAgent:
         - OR systematic false positive issue
         """
         # In production:
-        # concurrent = self.storage.query_recent_alerts(
+        # concurrent = await self.storage.query_recent_alerts(
         #     user_id=user_id,
         #     ip=ip,
         #     time_window=timedelta(hours=1)
@@ -241,29 +422,64 @@ class ContextAgent:
         return concurrent
 
 
+# Mock vector DB contents returned for every similar-incident search
+_MOCK_SIMILAR_INCIDENTS = [
+    {
+        "alert_id": "LOGIN-12345",
+        "timestamp": "2024-01-03T14:22:00",
+        "threat_type": "suspicious_login",
+        "confidence": 75,
+        "outcome": "false_positive",
+        "analyst_notes": "User traveling for work, verified via Slack",
+        "similarity_score": 0.85
+    },
+    {
+        "alert_id": "LOGIN-12389",
+        "timestamp": "2024-01-02T09:15:00",
+        "threat_type": "suspicious_login",
+        "confidence": 92,
+        "outcome": "true_positive",
+        "analyst_notes": "Confirmed credential stuffing attack, IP blocked",
+        "similarity_score": 0.78
+    }
+]
+
+
 class MockStorageClient:
     """
     Mock database client for demonstration
-    In production, this would be actual Postgres + Qdrant clients
+    In production, this would be actual async Postgres + Qdrant clients
+    (asyncpg pool, qdrant_client.AsyncQdrantClient)
     """
     
-    def query_user_profile(self, user_id: str) -> Dict:
+    async def query_user_profile(self, user_id: str) -> Dict:
         """Query user database"""
         return {}
     
-    def vector_search(self, query_embedding, filter, limit) -> List[Dict]:
+    async def vector_search(self, query_embedding, filter, limit) -> List[Dict]:
         """Query vector database for similar incidents"""
         return []
     
-    def check_ip_reputation(self, ip: str) -> str:
+    async def search_batch(self, collection_name: str, requests: List[Dict]) -> List[List[Dict]]:
+        """
+        Batched vector search, one hit list per request
+        
+        In production: qdrant_client.search_batch(
+            collection_name=collection_name,
+            requests=[SearchRequest(**r) for r in requests]
+        ) with each ScoredPoint flattened to payload + similarity_score
+        """
+        return [[dict(incident) for incident in _MOCK_SIMILAR_INCIDENTS] for _ in requests]
+    
+    async def check_ip_reputation(self, ip: str) -> str:
         """Check IP against internal reputation database"""
         return "unknown"
     
-    def query_logs(self, user_id: str, limit: int) -> List[Dict]:
+    async def query_logs(self, user_id: str, limit: int) -> List[Dict]:
         """Query log database"""
         return []
     
-    def query_recent_alerts(
+    async def query_recent_alerts(
         self,
         user_id: Optional[str],
         ip: Optional[str],
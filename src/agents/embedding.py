@@ -0,0 +1,135 @@
+"""
+Signal Embedding
+Turns detection signals into vectors for similar-incident search
+"""
+from typing import Tuple
+import functools
+import hashlib
+import math
+import os
+
+import numpy as np
+
+
+EMBEDDING_DIM = 64
+
+
+def _bucket(token: str, dim: int) -> int:
+    # blake2b rather than hash(): str hashing is randomized per process,
+    # and stored incident vectors must stay comparable across restarts
+    digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % dim
+
+
+def embed_signals(signals, dim: int = EMBEDDING_DIM) -> Tuple[float, ...]:
+    """
+    Feature-hashed embedding of an alert's signals
+
+    Each signal name lands in a bucket weighted by its detection weight,
+    so alerts that fired the same signals with similar weights end up
+    close together. Cheap stand-in for a learned sentence embedder.
+
+    The vector only depends on the (name, weight) pairs, so it is cached
+    on that canonical content: an alert burst with identical signals is
+    embedded once. The returned tuple is shared; don't mutate it.
+    """
+    return _embed_canonical(signal_key(signals), dim)
+
+
+def signal_key(signals) -> Tuple[Tuple[str, int], ...]:
+    """Order-independent content key for a list of signals"""
+    return tuple(sorted((signal.name, signal.weight) for signal in signals))
+
+
+@functools.lru_cache(maxsize=50_000)
+def _embed_canonical(key: Tuple[Tuple[str, int], ...], dim: int) -> Tuple[float, ...]:
+    vector = [0.0] * dim
+    for name, weight in key:
+        vector[_bucket(name, dim)] += weight / 100
+
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm:
+        vector = [v / norm for v in vector]
+    return tuple(vector)
+
+
+embedding_cache_info = _embed_canonical.cache_info
+
+
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+
+
+def export_quantized_model(model_id: str, output_dir: str) -> str:
+    """
+    Export a sentence-transformers model to ONNX with int8 dynamic quantization
+
+    One-off build step (needs `optimum[onnxruntime]`); the output directory
+    holds the quantized model plus tokenizer files for OnnxSignalEmbedder.
+    On AVX-512 VNNI CPUs the int8 matmuls run several times faster than
+    FP32 and the model is ~4x smaller.
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    model = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+    quantizer = ORTQuantizer.from_pretrained(model)
+    quantizer.quantize(
+        save_dir=output_dir,
+        quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    )
+    AutoTokenizer.from_pretrained(model_id).save_pretrained(output_dir)
+    return output_dir
+
+
+class OnnxSignalEmbedder:
+    """
+    Sentence embedder running an int8-quantized model on ONNX Runtime
+
+    Drop-in replacement for embed_signals (pass it to ContextAgent as
+    `embedder`); vectors come from the signal descriptions rather than
+    hashed names, so similar-incident search matches on meaning. The
+    collection's vector size must be `self.dim`.
+
+    Requires `onnxruntime` and `transformers`; both are imported lazily
+    so the hashed embedder keeps working without them.
+    """
+
+    def __init__(self, model_dir: str, max_length: int = 128, cache_size: int = 50_000):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, QUANTIZED_MODEL_FILE),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_length = max_length
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self.dim = self.session.get_outputs()[0].shape[-1]
+
+        # Same burst-level memoization as embed_signals, keyed on the text
+        self._embed_text = functools.lru_cache(maxsize=cache_size)(self._run)
+
+    def __call__(self, signals) -> Tuple[float, ...]:
+        text = "; ".join(sorted(f"{s.name}: {s.description}" for s in signals))
+        return self._embed_text(text)
+
+    def _run(self, text: str) -> Tuple[float, ...]:
+        encoded = self.tokenizer(
+            text,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        inputs = {k: v for k, v in encoded.items() if k in self._input_names}
+        hidden = self.session.run(None, inputs)[0]  # (1, seq_len, dim)
+
+        # Mean pooling over real tokens, then L2 normalize
+        mask = encoded["attention_mask"][..., None].astype(hidden.dtype)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return tuple(pooled[0].tolist())
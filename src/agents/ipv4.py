@@ -0,0 +1,32 @@
+"""
+IPv4 Packing
+Compact integer form of dotted-quad addresses for array columns and sets
+"""
+from typing import Optional
+import socket
+
+
+# Column value for "no address" (or an address that isn't IPv4)
+NO_IP = 0
+
+
+def pack_ipv4(ip: Optional[str]) -> int:
+    """
+    Pack a dotted-quad IPv4 address into an unsigned 32-bit int
+
+    Missing, malformed, or IPv6 addresses map to NO_IP so callers can fill
+    uint32 columns without special-casing bad rows.
+    """
+    if not ip:
+        return NO_IP
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+    except OSError:
+        return NO_IP
+
+
+def unpack_ipv4(packed: int) -> Optional[str]:
+    """Inverse of pack_ipv4; NO_IP comes back as None"""
+    if packed == NO_IP:
+        return None
+    return socket.inet_ntop(socket.AF_INET, int(packed).to_bytes(4, "big"))
@@ -2,10 +2,14 @@
 Agent Orchestrator
 Coordinates the three-agent investigation workflow
 """
-from typing import Optional
-from datetime import datetime
-import uuid
+from datetime import timedelta
+from typing import List, Optional
+from operator import attrgetter
+from string import Template
+import asyncio
 import logging
+import secrets
+import time
 
 from src.agents.context import ContextAgent, MockStorageClient
 from src.agents.reasoning import ReasoningAgent, format_risk_assessment_for_display
@@ -19,6 +23,81 @@ from src.response.executor import (
 logger = logging.getLogger(__name__)
 
 
+# Compiled once at import; get_human_summary only substitutes fields
+_RULE = "=" * 70
+
+_SUMMARY_TEMPLATE = Template("""
+$rule
+    SECURITY ALERT INVESTIGATION
+$rule
+
+ALERT ID: $alert_id
+THREAT TYPE: $threat_type
+SEVERITY: $severity
+DETECTION CONFIDENCE: $confidence/100
+
+AFFECTED ENTITY:
+  User: $user_id
+  IP: $ip
+  Country: $country
+
+DETECTION SIGNALS:
+$signals
+
+$assessment
+
+$rule
+ RECOMMENDED ACTION
+$rule
+
+ACTION: $action_type
+CONFIDENCE: $action_confidence/100
+BLAST RADIUS: $blast_radius
+REVERSIBLE: $reversible
+AUTO-EXPIRE: $auto_expire
+
+JUSTIFICATION:
+$justification
+
+$rule
+  EXECUTION STATUS
+$rule
+
+STATUS: $status
+REASON: $reason
+
+""")
+
+_ESCALATION_NOTE = """
+  ANALYST ACTION REQUIRED
+
+This action requires human approval due to:
+- High blast radius, OR
+- Confidence below auto-execution threshold, OR
+- Protected entity targeted, OR
+- Circuit breaker engaged
+
+APPROVE: Execute recommended action
+REJECT: Mark as false positive, no action taken
+MODIFY: Adjust action parameters (duration, scope, etc.)
+
+"""
+
+_FOOTER_TEMPLATE = Template("""
+$rule
+Investigation ID: $investigation_id
+Completed in: ${investigation_time}s
+$rule
+""")
+
+_alert_fields = attrgetter(
+    "alert_id", "threat_type_str", "severity_str", "confidence", "affected_entities"
+)
+_action_fields = attrgetter(
+    "action_type_str", "confidence", "blast_radius_str", "reversible", "auto_expire", "justification"
+)
+
+
 class AgentOrchestrator:
     """
     Coordinates multi-agent investigation and response
@@ -34,7 +113,8 @@ class AgentOrchestrator:
     def __init__(
         self,
         anthropic_api_key: Optional[str] = None,
-        storage_client = None
+        storage_client = None,
+        max_concurrency: int = 32
     ):
         # Initialize agents
         self.context_agent = ContextAgent(
@@ -42,31 +122,59 @@ class AgentOrchestrator:
         )
         self.reasoning_agent = ReasoningAgent(anthropic_api_key)
         self.action_executor = ActionExecutor()
+        
+        # Caps in-flight investigations so an alert burst doesn't stampede
+        # Postgres/Qdrant/the LLM API with unbounded concurrent requests
+        self._sem = asyncio.Semaphore(max_concurrency)
+    
+    async def investigate_many(self, alerts, dry_run: bool = False) -> List[dict]:
+        """
+        Investigate a batch of alerts concurrently
+        
+        At most `max_concurrency` investigations run at once; results are
+        returned in the same order as `alerts`.
+        """
+        return await asyncio.gather(*[self._run(alert, dry_run) for alert in alerts])
+    
+    async def _run(self, alert, dry_run: bool):
+        async with self._sem:
+            return await self.investigate(alert, dry_run=dry_run)
     
-    def investigate(self, alert, dry_run: bool = False):
+    async def investigate(self, alert, dry_run: bool = False):
         """
         Full investigation workflow for an alert
         
         Returns:
             dict with investigation results and action decision
         """
-        investigation_id = str(uuid.uuid4())
-        start_time = datetime.now()
+        investigation_id = secrets.token_hex(16)
+        start_time = time.perf_counter()
         
-        logger.info(f"🔍 Starting investigation {investigation_id} for alert {alert.alert_id}")
+        logger.info("🔍 Starting investigation %s for alert %s", investigation_id, alert.alert_id)
         
         # Step 1: Context Agent enriches alert
         logger.info("  → Context Agent: Gathering background information...")
-        enriched_context = self.context_agent.enrich(alert)
-        logger.info(f"    ✓ Found {len(enriched_context.similar_incidents)} similar past incidents")
-        logger.info(f"    ✓ User profile: {enriched_context.user_profile.get('role')} account, {enriched_context.user_profile.get('account_age_days')} days old")
+        enriched_context = await self.context_agent.enrich(alert)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("    ✓ Found %d similar past incidents", len(enriched_context.similar_incidents))
+            profile = enriched_context.user_profile
+            logger.info(
+                "    ✓ User profile: %s account, %s days old",
+                profile.role if profile else None,
+                profile.account_age_days if profile else None
+            )
         
         # Step 2: Reasoning Agent analyzes threat
         logger.info("  → Reasoning Agent: Analyzing threat...")
-        risk_assessment = self.reasoning_agent.analyze(alert, enriched_context.__dict__)
-        logger.info(f"    ✓ Risk Level: {risk_assessment.risk_level.value.upper()} ({risk_assessment.risk_score}/100)")
-        logger.info(f"    ✓ Attack Pattern: {risk_assessment.attack_pattern}")
-        logger.info(f"    ✓ False Positive Likelihood: {risk_assessment.false_positive_likelihood}")
+        risk_assessment = await self.reasoning_agent.analyze(alert, enriched_context)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "    ✓ Risk Level: %s (%d/100)",
+                risk_assessment.risk_level_str,
+                risk_assessment.risk_score
+            )
+            logger.info("    ✓ Attack Pattern: %s", risk_assessment.attack_pattern)
+            logger.info("    ✓ False Positive Likelihood: %s", risk_assessment.false_positive_likelihood)
         
         # Step 3: Action Agent generates response
         logger.info("  → Action Agent: Determining response...")
@@ -75,25 +183,25 @@ class AgentOrchestrator:
             risk_assessment,
             action_id=f"ACT-{investigation_id[:8]}"
         )
-        logger.info(f"    ✓ Recommended Action: {action.action_type.value}")
-        logger.info(f"    ✓ Blast Radius: {action.blast_radius.value}")
+        logger.info("    ✓ Recommended Action: %s", action.action_type.value)
+        logger.info("    ✓ Blast Radius: %s", action.blast_radius.value)
         
         # Step 4: Evaluate action (execute or escalate)
         logger.info("  → Executing safety checks...")
         execution_result = self.action_executor.evaluate_action(action, dry_run=dry_run)
         
         if execution_result.status == ExecutionStatus.EXECUTED:
-            logger.info(f"    Action EXECUTED automatically")
+            logger.info("    Action EXECUTED automatically")
             if execution_result.rollback_by:
-                logger.info(f"    ⏰ Auto-rollback at {execution_result.rollback_by}")
+                logger.info("    ⏰ Auto-rollback at %s", execution_result.rollback_by)
         elif execution_result.status == ExecutionStatus.ESCALATED:
-            logger.info(f"    🔼 Action ESCALATED to human analyst")
-            logger.info(f"    📋 Reason: {execution_result.reason}")
+            logger.info("    🔼 Action ESCALATED to human analyst")
+            logger.info("    📋 Reason: %s", execution_result.reason)
         elif execution_result.status == ExecutionStatus.REJECTED:
-            logger.warning(f"      Action REJECTED: {execution_result.reason}")
+            logger.warning("      Action REJECTED: %s", execution_result.reason)
         
-        investigation_time = (datetime.now() - start_time).total_seconds()
-        logger.info(f"   Investigation {investigation_id} completed in {investigation_time:.2f}s")
+        investigation_time = time.perf_counter() - start_time
+        logger.info("   Investigation %s completed in %.2fs", investigation_id, investigation_time)
         
         return {
             "investigation_id": investigation_id,
@@ -105,6 +213,11 @@ class AgentOrchestrator:
             "investigation_time_seconds": investigation_time
         }
     
+    async def aclose(self):
+        """Release pooled connections held by the agents"""
+        await self.context_agent.aclose()
+        await self.reasoning_agent.aclose()
+    
     def get_human_summary(self, investigation_result: dict) -> str:
         """
         Format investigation for human analyst review
@@ -113,76 +226,41 @@ class AgentOrchestrator:
         an action is escalated for human approval
         """
         alert = investigation_result["alert"]
-        assessment = investigation_result["risk_assessment"]
         action = investigation_result["recommended_action"]
         exec_result = investigation_result["execution_result"]
         
-        summary = f"""
-{'='*70}
-    SECURITY ALERT INVESTIGATION
-{'='*70}
-
-ALERT ID: {alert.alert_id}
-THREAT TYPE: {alert.threat_type.value}
-SEVERITY: {alert.severity.value}
-DETECTION CONFIDENCE: {alert.confidence}/100
-
-AFFECTED ENTITY:
-  User: {alert.affected_entities.get('user_id', 'N/A')}
-  IP: {alert.affected_entities.get('ip', 'N/A')}
-  Country: {alert.affected_entities.get('country', 'N/A')}
-
-DETECTION SIGNALS:
-{chr(10).join(f'  • {s.description} [weight: {s.weight}]' for s in alert.signals)}
-
-{format_risk_assessment_for_display(assessment)}
-
-{'='*70}
- RECOMMENDED ACTION
-{'='*70}
-
-ACTION: {action.action_type.value.upper()}
-CONFIDENCE: {action.confidence}/100
-BLAST RADIUS: {action.blast_radius.value}
-REVERSIBLE: {'Yes' if action.reversible else 'No'}
-AUTO-EXPIRE: {action.auto_expire if action.auto_expire else 'Manual intervention required'}
-
-JUSTIFICATION:
-{action.justification}
-
-{'='*70}
-  EXECUTION STATUS
-{'='*70}
-
-STATUS: {exec_result.status.value.upper()}
-REASON: {exec_result.reason}
-
-"""
+        alert_id, threat_type, severity, confidence, entities = _alert_fields(alert)
+        action_type, action_confidence, blast_radius, reversible, auto_expire, justification = _action_fields(action)
         
-        if exec_result.status == ExecutionStatus.ESCALATED:
-            summary += """
-  ANALYST ACTION REQUIRED
-
-This action requires human approval due to:
-- High blast radius, OR
-- Confidence below auto-execution threshold, OR
-- Protected entity targeted, OR
-- Circuit breaker engaged
-
-APPROVE: Execute recommended action
-REJECT: Mark as false positive, no action taken
-MODIFY: Adjust action parameters (duration, scope, etc.)
-
-"""
+        summary = _SUMMARY_TEMPLATE.substitute(
+            rule=_RULE,
+            alert_id=alert_id,
+            threat_type=threat_type,
+            severity=severity,
+            confidence=confidence,
+            user_id=entities.get('user_id', 'N/A'),
+            ip=entities.get('ip', 'N/A'),
+            country=entities.get('country', 'N/A'),
+            signals=alert.signals_display,
+            assessment=format_risk_assessment_for_display(investigation_result["risk_assessment"]),
+            action_type=action_type,
+            action_confidence=action_confidence,
+            blast_radius=blast_radius,
+            reversible='Yes' if reversible else 'No',
+            auto_expire=timedelta(seconds=auto_expire) if auto_expire else 'Manual intervention required',
+            justification=justification,
+            status=exec_result.status_str,
+            reason=exec_result.reason,
+        )
         
-        summary += f"""
-{'='*70}
-Investigation ID: {investigation_result['investigation_id']}
-Completed in: {investigation_result['investigation_time_seconds']:.2f}s
-{'='*70}
-"""
+        if exec_result.status == ExecutionStatus.ESCALATED:
+            summary += _ESCALATION_NOTE
         
-        return summary
+        return summary + _FOOTER_TEMPLATE.substitute(
+            rule=_RULE,
+            investigation_id=investigation_result['investigation_id'],
+            investigation_time="%.2f" % investigation_result['investigation_time_seconds'],
+        )
 
 
 def demo_workflow():
@@ -198,48 +276,18 @@ def demo_workflow():
     
     detector = SuspiciousLoginDetector()
     
-    # Mock logs showing suspicious activity
+    # Mock logs showing suspicious activity: same timestamp and source,
+    # rotating through automation user agents
+    base_log = {
+        "timestamp": datetime.now().isoformat(),
+        "user_id": "user-12345",
+        "status": "failed",
+        "ip": "45.67.89.12",
+        "country": "RO"
+    }
     suspicious_logs = [
-        {
-            "timestamp": datetime.now().isoformat(),
-            "user_id": "user-12345",
-            "status": "failed",
-            "ip": "45.67.89.12",
-            "country": "RO",
-            "user_agent": "HeadlessChrome/91.0"
-        },
-        {
-            "timestamp": datetime.now().isoformat(),
-            "user_id": "user-12345",
-            "status": "failed",
-            "ip": "45.67.89.12",
-            "country": "RO",
-            "user_agent": "HeadlessChrome/91.0"
-        },
-        {
-            "timestamp": datetime.now().isoformat(),
-            "user_id": "user-12345",
-            "status": "failed",
-            "ip": "45.67.89.12",
-            "country": "RO",
-            "user_agent": "HeadlessChrome/91.0"
-        },
-        {
-            "timestamp": datetime.now().isoformat(),
-            "user_id": "user-12345",
-            "status": "failed",
-            "ip": "45.67.89.12",
-            "country": "RO",
-            "user_agent": "PhantomJS/2.1"
-        },
-        {
-            "timestamp": datetime.now().isoformat(),
-            "user_id": "user-12345",
-            "status": "failed",
-            "ip": "45.67.89.12",
-            "country": "RO",
-            "user_agent": "Selenium/3.14"
-        }
+        {**base_log, "user_agent": user_agent}
+        for user_agent in ("HeadlessChrome/91.0",) * 3 + ("PhantomJS/2.1", "Selenium/3.14")
     ]
     
     user_profile = {
@@ -261,15 +309,14 @@ def demo_workflow():
     
     # Run investigation
     orchestrator = AgentOrchestrator()
-    result = orchestrator.investigate(alert, dry_run=False)
+    result = asyncio.run(orchestrator.investigate(alert, dry_run=False))
     
     # Display summary
     print("\n" + orchestrator.get_human_summary(result))
 
 
 if __name__ == "__main__":
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(message)s'
-    )
+    from src.logging_config import configure_logging
+    
+    configure_logging(level=logging.INFO, format='%(message)s')
     demo_workflow()
@@ -2,26 +2,106 @@
 AI Reasoning Agent
 Uses Claude to analyze threats and explain risk in plain English
 """
-from dataclasses import dataclass
-from typing import List, Dict, Optional
-import json
+from dataclasses import dataclass, field
+from types import MappingProxyType, SimpleNamespace
+from typing import Annotated, FrozenSet, List, Dict, Literal, Mapping, Optional, Tuple, get_args
+import asyncio
 import os
+import re
+from bisect import bisect_right
 from enum import Enum
+from functools import lru_cache
+from operator import attrgetter
+from string import Template
+
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, ValidationInfo, field_validator
+
+from src.agents.cache import TTLCache
+from src.agents.context import EnrichedContext
 
 
 # Mock Anthropic API for demonstration
-# In production, use: from anthropic import Anthropic
+# In production, use: from anthropic import AsyncAnthropic
 class MockAnthropic:
-    """Simulates Claude API for demonstration"""
+    """Simulates the async Claude API client for demonstration"""
+    
+    class Batches:
+        """Message Batches API; mock batches finish immediately"""
+        
+        def __init__(self):
+            self._batches = {}
+        
+        async def create(self, requests):
+            batch_id = f"msgbatch_mock_{len(self._batches)}"
+            self._batches[batch_id] = [r["custom_id"] for r in requests]
+            return SimpleNamespace(id=batch_id, processing_status="ended")
+        
+        async def retrieve(self, batch_id):
+            return SimpleNamespace(id=batch_id, processing_status="ended")
+        
+        async def results(self, batch_id):
+            return _mock_batch_results(self._batches[batch_id])
     
     class Messages:
-        def create(self, model, max_tokens, messages, temperature=1.0):
+        def __init__(self):
+            self.batches = MockAnthropic.Batches()
+        
+        async def create(self, model, max_tokens, messages, temperature=1.0):
             # In real implementation, this calls Claude API
             # For demo, return structured response
             return MockResponse()
+        
+        def stream(self, model, max_tokens, messages, temperature=1.0):
+            return MockMessageStream(MockResponse().content[0].text.decode())
     
     def __init__(self):
         self.messages = self.Messages()
+    
+    async def close(self):
+        pass
+
+
+async def _mock_batch_results(custom_ids):
+    for custom_id in custom_ids:
+        yield SimpleNamespace(
+            custom_id=custom_id,
+            result=SimpleNamespace(type="succeeded", message=MockResponse())
+        )
+
+
+class MockMessageStream:
+    """
+    Simulates client.messages.stream(): an async context manager whose
+    text_stream yields the response in small deltas. Like the real model,
+    it keeps talking after the JSON object closes.
+    """
+    
+    def __init__(self, text: str, chunk_size: int = 16):
+        self._text = text + "\n\nLet me know if you need a deeper analysis of these signals."
+        self._chunk_size = chunk_size
+        self.closed = False
+        self.chunks_sent = 0
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def close(self):
+        self.closed = True
+    
+    @property
+    def text_stream(self):
+        return self._deltas()
+    
+    async def _deltas(self):
+        for start in range(0, len(self._text), self._chunk_size):
+            if self.closed:
+                return
+            self.chunks_sent += 1
+            yield self._text[start:start + self._chunk_size]
 
 
 class MockResponse:
@@ -29,7 +109,8 @@ class MockResponse:
     
     class Content:
         def __init__(self):
-            self.text = json.dumps({
+            # Raw bytes, as read off the wire; parsed without a decode step
+            self.text = orjson.dumps({
                 "risk_score": 85,
                 "attack_pattern": "credential_stuffing",
                 "reasoning": "Multiple failed logins from single IP using rotating user agents suggests automated attack",
@@ -52,133 +133,237 @@ class RiskLevel(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+# Score tiers: bisect_right(RISK_THRESHOLDS, score) is the index into RISK_LEVELS
+RISK_THRESHOLDS = (40, 60, 80)
+RISK_LEVELS = (RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRITICAL)
+
+# Recommendations per (score tier, attack pattern); "default" covers every
+# pattern without its own entry in that tier
+_TIER_MONITOR = ("Monitor for additional suspicious activity", "Log and review in next security analysis")
+_TIER_CONTAIN = ("Rate limit IP address", "Require MFA for next login", "Notify user of suspicious activity")
+_TIER_BLOCK = ("Block IP address immediately",)
+_TAKEOVER_RESPONSE = _TIER_BLOCK + ("Force password reset for affected account", "Revoke all active sessions")
+
+_RECS: Dict[tuple, tuple] = {
+    (0, "default"): ("Log for baseline analysis",),
+    (1, "default"): _TIER_MONITOR,
+    (2, "default"): _TIER_CONTAIN,
+    (3, "default"): _TIER_BLOCK,
+    (3, "credential_stuffing"): _TAKEOVER_RESPONSE,
+    (3, "account_takeover"): _TAKEOVER_RESPONSE,
+    (3, "privilege_escalation"): _TIER_BLOCK + (
+        "Lock affected account pending investigation",
+        "Review all actions taken by account in last 24h",
+    ),
+}
+_HUMAN_REVIEW = ("Escalate to human analyst for review",)
+
+
+@dataclass(slots=True, frozen=True)
 class RiskAssessment:
-    """Output from reasoning agent"""
+    """
+    Output from reasoning agent
+    
+    Deeply immutable (tuples and a read-only mapping, not just frozen
+    fields), so a cached assessment can be handed to every caller.
+    """
     risk_score: int  # 0-100
     risk_level: RiskLevel
     attack_pattern: str
     reasoning: str  # Plain English explanation
     false_positive_likelihood: str  # low/medium/high
-    missing_context: List[str]
-    confidence_factors: Dict[str, List[str]]
-    recommended_actions: List[str]
+    missing_context: Tuple[str, ...]
+    confidence_factors: Mapping[str, Tuple[str, ...]]
+    recommended_actions: Tuple[str, ...]
+    
+    risk_level_str: str = field(init=False, repr=False, compare=False)  # For display
+    
+    def __post_init__(self):
+        object.__setattr__(self, "risk_level_str", self.risk_level.value.upper())
+    
+    def to_json(self) -> bytes:
+        """Serialize for dashboards/export; orjson encodes the slotted dataclass natively"""
+        return orjson.dumps(self, default=dict)  # default: the read-only confidence_factors
 
 
-class ReasoningAgent:
+AttackPattern = Literal[
+    "credential_stuffing", "brute_force", "account_takeover",
+    "data_exfiltration", "api_abuse", "privilege_escalation",
+    "sql_injection", "command_injection", "lateral_movement",
+    "reconnaissance", "unknown"
+]
+
+# Lowercase, as the model is asked to emit them
+_KNOWN_PATTERNS: FrozenSet[str] = frozenset(get_args(AttackPattern))
+
+
+class RiskAssessmentSchema(BaseModel):
     """
-    Analyzes alerts using Claude to provide human-readable risk assessment
+    Validated shape of the model's JSON response
     
-    Key responsibilities:
-    1. Interpret detection signals in context
-    2. Identify attack patterns
-    3. Assess false positive likelihood
-    4. Explain reasoning in plain English
-    5. Suggest what additional context would help
+    Parsed straight from the raw response bytes with model_validate_json,
+    so decoding, type checks, and the safety constraints below all run in
+    pydantic-core in one pass. Pass the alert as validation context:
+    `RiskAssessmentSchema.model_validate_json(text, context={"alert": alert})`.
+    
+    Safety constraints:
+    1. Risk score is clamped to 0-100, and may not exceed detection
+       confidence by more than 10 points (prevents an overconfident LLM)
+    2. Attack pattern must be a known type (no hallucinated threats);
+       anything else becomes "unknown"
+    3. Reasoning must reference at least one actual signal
     """
+    model_config = ConfigDict(str_strip_whitespace=True, frozen=True)
     
-    def __init__(self, api_key: Optional[str] = None):
-        # In production: self.client = Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
-        self.client = MockAnthropic()  # Demo mode
-        self.model = "claude-sonnet-4-20250514"
-        
-    def analyze(self, alert, enriched_context: Dict) -> RiskAssessment:
-        """
-        Analyze an alert with enriched context to produce risk assessment
-        
-        Args:
-            alert: Alert object from detection engine
-            enriched_context: Additional context from ContextAgent
-            
-        Returns:
-            RiskAssessment with reasoning and recommendations
-        """
-        # Build structured prompt
-        prompt = self._build_analysis_prompt(alert, enriched_context)
-        
-        # Call Claude API with safety constraints
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=1000,
-            temperature=0.3,  # Lower temperature for more consistent reasoning
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
-        )
-        
-        # Parse structured response
-        try:
-            result = json.loads(response.content[0].text)
-        except json.JSONDecodeError:
-            # Fallback if LLM doesn't return valid JSON
-            result = self._fallback_heuristic_analysis(alert)
-        
-        # Validate and constraint the response
-        validated_result = self._validate_response(result, alert)
-        
-        # Convert to RiskAssessment object
-        return self._to_risk_assessment(validated_result)
+    risk_score: Annotated[int, Field(ge=0, le=100)] = 50
+    attack_pattern: AttackPattern = "unknown"
+    reasoning: str = ""
+    false_positive_likelihood: str = "medium"  # low/medium/high
+    missing_context: List[str] = []
+    confidence_factors: Dict[str, List[str]] = {"supporting": [], "contradicting": []}
     
-    def _build_analysis_prompt(self, alert, context: Dict) -> str:
-        """
-        Construct prompt for Claude with all relevant information
-        
-        Prompt engineering principles:
-        - Provide clear structure
-        - Include all signals with explanations
-        - Request specific output format (JSON)
-        - Set boundaries on what agent can/cannot do
-        """
-        signals_text = "\n".join([
-            f"- {s.name}: {s.description} (weight: {s.weight}/100)"
-            for s in alert.signals
-        ])
-        
-        user_context = context.get("user_profile", {})
-        similar_incidents = context.get("similar_incidents", [])
-        threat_intel = context.get("threat_intelligence", {})
-        
-        prompt = f"""You are a security analyst evaluating a potential threat. Analyze the following alert and provide a structured risk assessment.
+    @field_validator("risk_score", mode="before")
+    @classmethod
+    def _clamp_score(cls, value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return max(0, min(100, int(value)))
+        return value
+    
+    @field_validator("risk_score")
+    @classmethod
+    def _cap_at_detection_confidence(cls, value: int, info: ValidationInfo) -> int:
+        alert = (info.context or {}).get("alert")
+        if alert is not None and value > alert.confidence + 10:
+            return alert.confidence
+        return value
+    
+    @field_validator("attack_pattern", mode="before")
+    @classmethod
+    def _known_pattern(cls, value):
+        if isinstance(value, str):
+            # Well-formed responses match as-is; only normalize on a miss
+            if value in _KNOWN_PATTERNS:
+                return value
+            value = value.strip().lower()
+            if value in _KNOWN_PATTERNS:
+                return value
+        return "unknown"
+    
+    @field_validator("reasoning")
+    @classmethod
+    def _references_signal(cls, value: str, info: ValidationInfo) -> str:
+        alert = (info.context or {}).get("alert")
+        if alert is None or not alert.signals:
+            return value
+        matcher = _signal_matcher(tuple(signal.name for signal in alert.signals))
+        if matcher.search(value) is None:
+            return f"Based on {alert.signals[0].name}: {value}"
+        return value
+
+
+@lru_cache(maxsize=1024)
+def _signal_matcher(signal_names: tuple) -> re.Pattern:
+    """
+    One case-insensitive alternation over all signal names
+    
+    Scans the reasoning once and stops at the first hit, instead of one
+    lowercase-and-scan per signal. Detectors emit a small set of signal
+    combinations, so the compiled pattern is almost always a cache hit.
+    """
+    return re.compile("|".join(map(re.escape, dict.fromkeys(signal_names))), re.IGNORECASE)
+
+
+class JSONObjectTracker:
+    """
+    Finds where a streamed top-level JSON object ends
+    
+    Tracks brace depth (ignoring braces inside strings) across text deltas
+    so the stream can be closed as soon as the object is complete, instead
+    of paying for whatever prose the model adds afterwards. If the first
+    non-whitespace character isn't "{", the response isn't a bare object
+    and the tracker gives up (abandoned) so the caller reads it in full.
+    """
+    
+    __slots__ = ("depth", "in_string", "escape", "started", "abandoned")
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.abandoned = False
+    
+    def feed(self, chunk: str) -> Optional[int]:
+        """Consume a delta; return the index just past the closing brace, if it's in this chunk"""
+        if self.abandoned:
+            return None
+        for i, char in enumerate(chunk):
+            if not self.started:
+                if char == "{":
+                    self.started = True
+                    self.depth = 1
+                elif not char.isspace():
+                    self.abandoned = True
+                    return None
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+            elif char == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return None
+
+
+# Compiled once; _build_analysis_prompt only substitutes per-alert fields
+_ANALYSIS_PROMPT = Template("""You are a security analyst evaluating a potential threat. Analyze the following alert and provide a structured risk assessment.
 
 ALERT DETAILS:
-- Type: {alert.threat_type.value}
-- Severity: {alert.severity.value}
-- Confidence: {alert.confidence}/100
-- Affected User: {alert.affected_entities.get('user_id')}
-- Source IP: {alert.affected_entities.get('ip')}
+- Type: $threat_type
+- Severity: $severity
+- Confidence: $confidence/100
+- Affected User: $user_id
+- Source IP: $ip
 
 DETECTION SIGNALS:
-{signals_text}
+$signals
 
 USER CONTEXT:
-- Account Age: {user_context.get('account_age_days', 'unknown')} days
-- Typical Login Countries: {user_context.get('typical_countries', [])}
-- Typical Activity Hours: {user_context.get('typical_hours', 'unknown')}
-- Previous Alerts: {user_context.get('previous_alerts', 0)}
-- User Role: {user_context.get('role', 'user')}
+- Account Age: $account_age days
+- Typical Login Countries: $typical_countries
+- Typical Activity Hours: $typical_hours
+- Previous Alerts: $previous_alerts
+- User Role: $role
 
 SIMILAR PAST INCIDENTS:
-{json.dumps(similar_incidents[:3], indent=2) if similar_incidents else "None found"}
+$similar_incidents
 
 THREAT INTELLIGENCE:
-- IP Reputation: {threat_intel.get('ip_reputation', 'unknown')}
-- Known Attack Patterns: {threat_intel.get('known_patterns', [])}
+- IP Reputation: $ip_reputation
+- Known Attack Patterns: $known_patterns
 
 TASK:
 Analyze this alert and provide your assessment in JSON format with these fields:
 
-{{
+{
   "risk_score": <0-100>,
   "attack_pattern": "<brief name of attack pattern, e.g. 'credential_stuffing', 'data_exfiltration'>",
   "reasoning": "<2-3 sentence explanation of why this is or isn't a real threat>",
   "false_positive_likelihood": "<low|medium|high>",
   "missing_context": ["<what additional info would help confirm or refute?>"],
-  "confidence_factors": {{
+  "confidence_factors": {
     "supporting": ["<signals that support this being a real threat>"],
     "contradicting": ["<signals that suggest false positive>"]
-  }}
-}}
+  }
+}
 
 IMPORTANT CONSTRAINTS:
 - Base your reasoning ONLY on the provided signals and context
@@ -187,52 +372,239 @@ IMPORTANT CONSTRAINTS:
 - Consider both true positive and false positive scenarios
 - If contradictory signals exist, acknowledge the ambiguity
 
-Provide ONLY the JSON response, no additional text."""
+Provide ONLY the JSON response, no additional text.""")
+
+_format_signal = "- {0.name}: {0.description} (weight: {0.weight}/100)".format
+
+# Profile fields used in the prompt, and what to show when there is no profile
+_profile_fields = attrgetter(
+    "account_age_days", "typical_countries", "typical_hours", "previous_alerts", "role"
+)
+_UNKNOWN_PROFILE = ("unknown", (), None, 0, "user")
 
-        return prompt
+
+class ReasoningAgent:
+    """
+    Analyzes alerts using Claude to provide human-readable risk assessment
+    
+    Key responsibilities:
+    1. Interpret detection signals in context
+    2. Identify attack patterns
+    3. Assess false positive likelihood
+    4. Explain reasoning in plain English
+    5. Suggest what additional context would help
+    """
     
-    def _validate_response(self, result: Dict, alert) -> Dict:
+    def __init__(self, api_key: Optional[str] = None):
+        # In production, one pooled connection set for every analysis:
+        # self.client = AsyncAnthropic(
+        #     api_key=api_key or os.getenv("ANTHROPIC_API_KEY"),
+        #     http_client=httpx.AsyncClient(
+        #         http2=True,
+        #         limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        #     )
+        # )
+        self.client = MockAnthropic()  # Demo mode
+        self.model = "claude-sonnet-4-20250514"
+        # Alert storms repeat the same signature (same IP, same signals)
+        # many times within minutes; reuse the first analysis
+        self.analysis_cache = TTLCache(maxsize=10_000, ttl=300)
+    
+    async def aclose(self):
+        """Release the API client's pooled connections"""
+        await self.client.close()
+        
+    async def analyze(
+        self,
+        alert,
+        enriched_context: EnrichedContext,
+        bypass_cache: bool = False
+    ) -> RiskAssessment:
         """
-        Validate LLM output against safety constraints
+        Analyze an alert with enriched context to produce risk assessment
         
-        Safety checks:
-        1. Risk score is within bounds (0-100)
-        2. Attack pattern is reasonable (no hallucinated threats)
-        3. Reasoning is grounded in actual signals
-        4. No confident assertions without evidence
+        Args:
+            alert: Alert object from detection engine
+            enriched_context: Additional context from ContextAgent
+            bypass_cache: Force a fresh analysis (e.g. analyst re-triage);
+                the result still refreshes the cache
+            
+        Returns:
+            RiskAssessment with reasoning and recommendations
         """
-        # Ensure risk score is reasonable
-        risk_score = result.get("risk_score", 50)
-        risk_score = max(0, min(100, risk_score))
+        key = self._analysis_key(alert, enriched_context)
+        if not bypass_cache:
+            cached = self.analysis_cache.get(key)
+            if cached is not None:
+                return cached
         
-        # Risk score shouldn't exceed detection confidence by more than 10 points
-        # (prevents LLM from being overconfident)
-        if risk_score > alert.confidence + 10:
-            risk_score = alert.confidence
+        # Build structured prompt
+        prompt = self._build_analysis_prompt(alert, enriched_context)
         
-        result["risk_score"] = risk_score
+        # Call Claude API with safety constraints; awaiting lets concurrent
+        # investigations overlap their LLM round-trips
+        text = await self._stream_json_response(prompt)
         
-        # Validate attack pattern is a known type
-        known_patterns = {
-            "credential_stuffing", "brute_force", "account_takeover",
-            "data_exfiltration", "api_abuse", "privilege_escalation",
-            "sql_injection", "command_injection", "lateral_movement",
-            "reconnaissance", "unknown"
-        }
-        if result.get("attack_pattern", "").lower() not in known_patterns:
-            result["attack_pattern"] = "unknown"
+        assessment = self._validated_assessment(text, alert)
+        if assessment is None:
+            # Not cached: a transient model failure shouldn't pin the
+            # degraded heuristic assessment for the whole TTL
+            return self._heuristic_assessment(alert)
+        self.analysis_cache.set(key, assessment)
+        return assessment
+    
+    async def analyze_batch(
+        self,
+        alerts,
+        enriched_contexts: List[EnrichedContext],
+        poll_interval: float = 30.0
+    ) -> List[RiskAssessment]:
+        """
+        Analyze many alerts through the Message Batches API
+        
+        For bulk work (re-triaging a day's alerts, backfills) rather than
+        live triage: one request submits every prompt, the server runs
+        them in parallel at half the per-token cost, and results can take
+        minutes to arrive. Interactive paths should keep using analyze().
+        
+        Alerts whose request errored or expired get the heuristic fallback
+        assessment, same as an unparseable response.
+        
+        Returns:
+            One RiskAssessment per alert, in input order
+        """
+        # custom_id must match [a-zA-Z0-9_-]{1,64}; alert IDs contain '.'
+        requests = [
+            {
+                "custom_id": f"alert-{i}",
+                "params": self._request_params(self._build_analysis_prompt(alert, context))
+            }
+            for i, (alert, context) in enumerate(zip(alerts, enriched_contexts))
+        ]
+        
+        batches = self.client.messages.batches
+        batch = await batches.create(requests=requests)
+        while batch.processing_status != "ended":
+            await asyncio.sleep(poll_interval)
+            batch = await batches.retrieve(batch.id)
+        
+        texts = {}
+        async for entry in await batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                texts[entry.custom_id] = entry.result.message.content[0].text
+        
+        return [
+            self._assessment_from_text(texts.get(f"alert-{i}"), alert)
+            for i, alert in enumerate(alerts)
+        ]
+    
+    def _analysis_key(self, alert, enriched_context: EnrichedContext) -> tuple:
+        """Signature of an alert for analysis reuse: same threat, signals, actor, and IP reputation"""
+        intel = enriched_context.threat_intelligence
+        entities = alert.affected_entities
+        return (
+            alert.threat_type,
+            frozenset((signal.name, signal.weight) for signal in alert.signals),
+            entities.get("ip"),
+            entities.get("user_id"),
+            intel.reputation if intel is not None else None,
+        )
+    
+    async def _stream_json_response(self, prompt: str) -> str:
+        """
+        Stream the response, stopping generation once the JSON object closes
         
-        # Ensure reasoning references actual signals
-        reasoning = result.get("reasoning", "")
-        signal_names = {s.name for s in alert.signals}
+        Leaving the stream context early closes the connection, so output
+        tokens after the closing brace are never generated or billed.
+        """
+        tracker = JSONObjectTracker()
+        parts = []
+        async with self.client.messages.stream(**self._request_params(prompt)) as stream:
+            async for chunk in stream.text_stream:
+                end = tracker.feed(chunk)
+                if end is not None:
+                    parts.append(chunk[:end])
+                    break
+                parts.append(chunk)
+        return "".join(parts)
+    
+    def _request_params(self, prompt: str) -> Dict:
+        """Messages API parameters shared by single and batched analysis"""
+        return {
+            "model": self.model,
+            "max_tokens": 1000,
+            "temperature": 0.3,  # Lower temperature for more consistent reasoning
+            "messages": [{
+                "role": "user",
+                "content": prompt
+            }]
+        }
+    
+    def _assessment_from_text(self, text, alert) -> RiskAssessment:
+        """Parse, validate, and convert a model response (None = no response)"""
+        assessment = self._validated_assessment(text, alert)
+        if assessment is None:
+            # Fallback if LLM doesn't return valid JSON matching the schema
+            assessment = self._heuristic_assessment(alert)
+        return assessment
+    
+    def _validated_assessment(self, text, alert) -> Optional[RiskAssessment]:
+        """Assessment from a model response, or None if it is missing or fails the schema"""
+        if text is None:
+            return None
+        # Parse and validate the raw response in one pass
+        try:
+            validated = RiskAssessmentSchema.model_validate_json(text, context={"alert": alert})
+        except ValidationError:
+            return None
+        return self._to_risk_assessment(validated)
+    
+    def _heuristic_assessment(self, alert) -> RiskAssessment:
+        validated = RiskAssessmentSchema.model_validate(
+            self._fallback_heuristic_analysis(alert),
+            context={"alert": alert}
+        )
+        return self._to_risk_assessment(validated)
+    
+    def _build_analysis_prompt(self, alert, context: EnrichedContext) -> str:
+        """
+        Construct prompt for Claude with all relevant information
         
-        # Check that reasoning mentions at least one actual signal
-        mentions_signal = any(sig_name in reasoning.lower() for sig_name in signal_names)
-        if not mentions_signal and alert.signals:
-            # Add signal reference to reasoning
-            result["reasoning"] = f"Based on {alert.signals[0].name}: {reasoning}"
+        Prompt engineering principles:
+        - Provide clear structure
+        - Include all signals with explanations
+        - Request specific output format (JSON)
+        - Set boundaries on what agent can/cannot do
+        """
+        similar_incidents = context.similar_incidents
+        threat_intel = context.threat_intelligence
+        entities = alert.affected_entities
+        if context.user_profile is not None:
+            account_age, typical_countries, typical_hours, previous_alerts, role = (
+                _profile_fields(context.user_profile)
+            )
+        else:
+            account_age, typical_countries, typical_hours, previous_alerts, role = _UNKNOWN_PROFILE
         
-        return result
+        return _ANALYSIS_PROMPT.substitute(
+            threat_type=alert.threat_type_str,
+            severity=alert.severity_str,
+            confidence=alert.confidence,
+            user_id=entities.get('user_id'),
+            ip=entities.get('ip'),
+            signals="\n".join(map(_format_signal, alert.signals)),
+            account_age=account_age,
+            typical_countries=list(typical_countries),
+            typical_hours=_format_hours(typical_hours),
+            previous_alerts=previous_alerts,
+            role=role,
+            similar_incidents=(
+                orjson.dumps(similar_incidents[:3], option=orjson.OPT_INDENT_2).decode()
+                if similar_incidents else "None found"
+            ),
+            ip_reputation=threat_intel.reputation if threat_intel else 'unknown',
+            known_patterns=list(threat_intel.known_patterns) if threat_intel else [],
+        )
     
     def _fallback_heuristic_analysis(self, alert) -> Dict:
         """
@@ -267,19 +639,12 @@ Provide ONLY the JSON response, no additional text."""
             }
         }
     
-    def _to_risk_assessment(self, result: Dict) -> RiskAssessment:
+    def _to_risk_assessment(self, result: RiskAssessmentSchema) -> RiskAssessment:
         """Convert validated result to RiskAssessment object"""
-        risk_score = result["risk_score"]
+        risk_score = result.risk_score
         
         # Map score to risk level
-        if risk_score >= 80:
-            risk_level = RiskLevel.CRITICAL
-        elif risk_score >= 60:
-            risk_level = RiskLevel.HIGH
-        elif risk_score >= 40:
-            risk_level = RiskLevel.MEDIUM
-        else:
-            risk_level = RiskLevel.LOW
+        risk_level = RISK_LEVELS[bisect_right(RISK_THRESHOLDS, risk_score)]
         
         # Generate action recommendations based on risk
         recommended_actions = self._generate_recommendations(risk_score, result)
@@ -287,75 +652,77 @@ Provide ONLY the JSON response, no additional text."""
         return RiskAssessment(
             risk_score=risk_score,
             risk_level=risk_level,
-            attack_pattern=result["attack_pattern"],
-            reasoning=result["reasoning"],
-            false_positive_likelihood=result.get("false_positive_likelihood", "medium"),
-            missing_context=result.get("missing_context", []),
-            confidence_factors=result.get("confidence_factors", {"supporting": [], "contradicting": []}),
+            attack_pattern=result.attack_pattern,
+            reasoning=result.reasoning,
+            false_positive_likelihood=result.false_positive_likelihood,
+            missing_context=tuple(result.missing_context),
+            confidence_factors=MappingProxyType(
+                {name: tuple(items) for name, items in result.confidence_factors.items()}
+            ),
             recommended_actions=recommended_actions
         )
     
-    def _generate_recommendations(self, risk_score: int, result: Dict) -> List[str]:
+    def _generate_recommendations(self, risk_score: int, result: RiskAssessmentSchema) -> Tuple[str, ...]:
         """Generate action recommendations based on risk level"""
-        attack_pattern = result.get("attack_pattern", "unknown")
-        
         # Base recommendations on risk score and attack type
-        recommendations = []
-        
-        if risk_score >= 80:
-            recommendations.append("Block IP address immediately")
-            if attack_pattern in ["credential_stuffing", "account_takeover"]:
-                recommendations.append("Force password reset for affected account")
-                recommendations.append("Revoke all active sessions")
-            elif attack_pattern in ["privilege_escalation"]:
-                recommendations.append("Lock affected account pending investigation")
-                recommendations.append("Review all actions taken by account in last 24h")
-        
-        elif risk_score >= 60:
-            recommendations.append("Rate limit IP address")
-            recommendations.append("Require MFA for next login")
-            recommendations.append("Notify user of suspicious activity")
-        
-        elif risk_score >= 40:
-            recommendations.append("Monitor for additional suspicious activity")
-            recommendations.append("Log and review in next security analysis")
-        
-        else:
-            recommendations.append("Log for baseline analysis")
+        tier = bisect_right(RISK_THRESHOLDS, risk_score)
+        recommendations = _RECS.get((tier, result.attack_pattern)) or _RECS[(tier, "default")]
         
         # Always recommend human review for edge cases
-        if result.get("false_positive_likelihood") in ["medium", "high"]:
-            recommendations.append("Escalate to human analyst for review")
+        if result.false_positive_likelihood in ("medium", "high"):
+            recommendations = recommendations + _HUMAN_REVIEW
         
         return recommendations
 
 
+def _format_hours(hours) -> str:
+    """Render a set/range of active hours as e.g. '9:00-18:00'"""
+    if not hours:
+        return "unknown"
+    return f"{min(hours)}:00-{max(hours) + 1}:00"
+
+
+def _bullets(append, items):
+    """Append one bullet line per item, or a blank line if there are none"""
+    if not items:
+        append("")
+    for item in items:
+        append(f"  • {item}")
+
+
 def format_risk_assessment_for_display(assessment: RiskAssessment) -> str:
     """
     Format risk assessment for human analyst viewing
     Plain English summary suitable for security dashboard
     """
-    output = f"""
-    RISK ASSESSMENT
-
-RISK LEVEL: {assessment.risk_level.value.upper()} ({assessment.risk_score}/100)
-ATTACK PATTERN: {assessment.attack_pattern}
-
-ANALYSIS:
-{assessment.reasoning}
-
-FALSE POSITIVE LIKELIHOOD: {assessment.false_positive_likelihood.upper()}
-
-   SUPPORTING EVIDENCE:
-{chr(10).join(f"  • {factor}" for factor in assessment.confidence_factors.get('supporting', []))}
-
-{'  CONTRADICTING EVIDENCE:' if assessment.confidence_factors.get('contradicting') else ''}
-{chr(10).join(f"  • {factor}" for factor in assessment.confidence_factors.get('contradicting', []))}
-
- MISSING CONTEXT:
-{chr(10).join(f"  • {ctx}" for ctx in assessment.missing_context)}
-
- RECOMMENDED ACTIONS:
-{chr(10).join(f"  {i+1}. {action}" for i, action in enumerate(assessment.recommended_actions))}
-"""
-    return output.strip()
+    factors = assessment.confidence_factors
+    contradicting = factors.get('contradicting', [])
+    actions = assessment.recommended_actions
+    
+    lines: List[str] = []
+    append = lines.append
+    append("RISK ASSESSMENT")
+    append("")
+    append(f"RISK LEVEL: {assessment.risk_level_str} ({assessment.risk_score}/100)")
+    append(f"ATTACK PATTERN: {assessment.attack_pattern}")
+    append("")
+    append("ANALYSIS:")
+    append(assessment.reasoning)
+    append("")
+    append(f"FALSE POSITIVE LIKELIHOOD: {assessment.false_positive_likelihood.upper()}")
+    append("")
+    append("   SUPPORTING EVIDENCE:")
+    _bullets(append, factors.get('supporting', []))
+    append("")
+    append("  CONTRADICTING EVIDENCE:" if contradicting else "")
+    _bullets(append, contradicting)
+    append("")
+    append(" MISSING CONTEXT:")
+    _bullets(append, assessment.missing_context)
+    append("")
+    append(" RECOMMENDED ACTIONS:")
+    if not actions:
+        append("")
+    for i, action in enumerate(actions, 1):
+        append(f"  {i}. {action}")
+    return "\n".join(lines).strip()
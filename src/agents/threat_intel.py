@@ -0,0 +1,57 @@
+"""
+Threat Intel Blocklist
+Membership checks for large IP blocklists against packed IPv4 ints
+"""
+from typing import Iterable, Optional
+import ipaddress
+
+from src.agents.ipv4 import NO_IP, pack_ipv4
+
+
+def _canonical_ipv6(ip: Optional[str]) -> Optional[str]:
+    """Compressed lowercase form of an IPv6 address, or None if it isn't one"""
+    if not ip or ":" not in ip:
+        return None
+    try:
+        return ipaddress.IPv6Address(ip).compressed
+    except ValueError:
+        return None
+
+
+class IPBlocklist:
+    """
+    IP blocklist: exact frozenset of packed uint32 IPv4 addresses
+
+    A packed address is a small int, which hashes to itself and takes
+    about half the memory of its dotted-quad string. Every lookup, hit or
+    miss, is one pack plus one hash probe; an empty blocklist (the
+    default) answers without packing at all. IPv6 entries don't pack, so
+    they go in a separate set of canonical strings; malformed entries are
+    dropped.
+    """
+
+    def __init__(self, ips: Iterable[str] = ()):
+        exact = set()
+        exact_v6 = set()
+        for ip in ips:
+            packed = pack_ipv4(ip)
+            if packed != NO_IP:
+                exact.add(packed)
+            else:
+                canonical = _canonical_ipv6(ip)
+                if canonical is not None:
+                    exact_v6.add(canonical)
+        self._exact = frozenset(exact)
+        self._exact_v6 = frozenset(exact_v6)
+
+    def __len__(self) -> int:
+        return len(self._exact) + len(self._exact_v6)
+
+    def __contains__(self, ip: str) -> bool:
+        if not (self._exact or self._exact_v6):
+            return False
+        packed = pack_ipv4(ip)
+        if packed != NO_IP:
+            return packed in self._exact
+        # None is never stored, so malformed addresses miss on their own
+        return _canonical_ipv6(ip) in self._exact_v6
@@ -0,0 +1,144 @@
+"""
+Similar Incident Search
+Coalesces per-alert vector queries into batched vector DB requests
+"""
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import asyncio
+
+
+SIMILAR_INCIDENTS_COLLECTION = "similar_incidents"
+
+# Binary-quantized candidates are rescored against the full vectors;
+# oversampling fetches 2x candidates so rescoring can recover recall
+QUANTIZED_SEARCH_PARAMS = {
+    "quantization": {"rescore": True, "oversampling": 2.0}
+}
+
+
+async def ensure_incident_collection(
+    client,
+    vector_size: int,
+    collection_name: str = SIMILAR_INCIDENTS_COLLECTION
+):
+    """
+    Create the similar-incidents collection if it doesn't exist yet
+
+    Full vectors live on disk; the 1-bit binary quantized copy stays in
+    RAM and serves the ANN scan (~32x smaller than float32). Binary
+    quantization loses recall on low-dimensional vectors, so this is
+    meant for the production sentence embedder rather than the hashed
+    stand-in.
+
+    Args:
+        client: qdrant_client.AsyncQdrantClient
+        vector_size: Embedding dimension
+    """
+    from qdrant_client import models  # Only needed when provisioning
+
+    if await client.collection_exists(collection_name):
+        return
+
+    await client.create_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(
+            size=vector_size,
+            distance=models.Distance.COSINE,
+            on_disk=True
+        ),
+        quantization_config=models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+    )
+
+
+class BatchingVectorSearcher:
+    """
+    Batches similar-incident searches issued by concurrent investigations
+
+    During an alert burst every investigation asks the vector DB the same
+    kind of question. Instead of one RPC per alert, queries are held for
+    up to `max_wait` seconds (or until `max_batch` are queued) and sent as
+    a single search_batch request; each caller gets its own result list.
+    """
+
+    def __init__(
+        self,
+        storage_client,
+        collection_name: str = SIMILAR_INCIDENTS_COLLECTION,
+        max_batch: int = 32,
+        max_wait: float = 0.02,
+        limit: int = 5,
+        search_params: Optional[Dict] = QUANTIZED_SEARCH_PARAMS
+    ):
+        """
+        Args:
+            storage_client: Must provide async search_batch(collection_name, requests)
+                returning one hit list per request (Qdrant search_batch semantics)
+            max_batch: Flush immediately once this many queries are queued
+            max_wait: Longest a query waits for others to join its batch (seconds)
+            limit: Default number of hits per query
+            search_params: Qdrant SearchParams sent with every query
+        """
+        self.storage = storage_client
+        self.collection_name = collection_name
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.limit = limit
+        self.search_params = search_params
+
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()  # Keep submit tasks referenced
+
+    async def query(
+        self,
+        embedding: Sequence[float],
+        filter: Optional[Dict] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Queue a search and wait for its share of the batched response"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        request = {
+            "vector": embedding,
+            "filter": filter,
+            "limit": limit or self.limit,
+            "params": self.search_params,
+            "with_payload": True,
+        }
+        self._pending.append((request, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send everything queued so far as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._submit(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _submit(self, batch: List[Tuple[Dict, asyncio.Future]]):
+        requests = [request for request, _ in batch]
+        try:
+            results = await self.storage.search_batch(self.collection_name, requests)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), hits in zip(batch, results):
+            if not future.done():  # Caller may have been cancelled
+                future.set_result(hits)
@@ -2,7 +2,11 @@
 Demo Script - Simulates Various Attack Scenarios
 Run this to see how the system detects and responds to different threats
 """
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
 from datetime import datetime, timedelta
+import asyncio
+import io
 import sys
 import os
 
@@ -15,16 +19,14 @@ from src.detection.rules import (
     PrivilegeEscalationDetector
 )
 from src.agents.orchestrator import AgentOrchestrator
+from src.logging_config import configure_logging
 import logging
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(message)s'
-)
+configure_logging(level=logging.INFO, format='%(message)s')
 
 
-def scenario_credential_stuffing():
+async def scenario_credential_stuffing():
     """
     Scenario 1: Credential Stuffing Attack
     
@@ -34,9 +36,10 @@ def scenario_credential_stuffing():
     - Automated tools (headless browsers)
     - VPN/foreign IP
     """
-    print("\n" + "="*70)
-    print("SCENARIO 1: Credential Stuffing Attack")
-    print("="*70 + "\n")
+    out = []
+    out.append("\n" + "="*70)
+    out.append("SCENARIO 1: Credential Stuffing Attack")
+    out.append("="*70 + "\n")
     
     detector = SuspiciousLoginDetector()
     orchestrator = AgentOrchestrator()
@@ -66,19 +69,21 @@ def scenario_credential_stuffing():
     alert = detector.detect(logs, user_profile)
     
     if alert:
-        print(f"   ALERT GENERATED")
-        print(f"   ID: {alert.alert_id}")
-        print(f"   Confidence: {alert.confidence}/100")
-        print(f"   Signals detected: {len(alert.signals)}\n")
+        out.append(f"   ALERT GENERATED")
+        out.append(f"   ID: {alert.alert_id}")
+        out.append(f"   Confidence: {alert.confidence}/100")
+        out.append(f"   Signals detected: {len(alert.signals)}\n")
         
         # Investigate
-        result = orchestrator.investigate(alert, dry_run=False)
-        print(orchestrator.get_human_summary(result))
+        result = await orchestrator.investigate(alert, dry_run=False)
+        out.append(orchestrator.get_human_summary(result))
     else:
-        print("  No alert generated (unexpected)")
+        out.append("  No alert generated (unexpected)")
+    
+    return "\n".join(out)
 
 
-def scenario_api_abuse():
+async def scenario_api_abuse():
     """
     Scenario 2: Bulk Data Extraction
     
@@ -88,9 +93,10 @@ def scenario_api_abuse():
     - Sequential resource access
     - Outside normal usage pattern
     """
-    print("\n" + "="*70)
-    print("SCENARIO 2: Bulk Data Extraction via API")
-    print("="*70 + "\n")
+    out = []
+    out.append("\n" + "="*70)
+    out.append("SCENARIO 2: Bulk Data Extraction via API")
+    out.append("="*70 + "\n")
     
     detector = AbnormalAPIDetector()
     orchestrator = AgentOrchestrator()
@@ -119,19 +125,21 @@ def scenario_api_abuse():
     alert = detector.detect(logs, user_profile)
     
     if alert:
-        print(f"   ALERT GENERATED")
-        print(f"   ID: {alert.alert_id}")
-        print(f"   Confidence: {alert.confidence}/100")
-        print(f"   Signals detected: {len(alert.signals)}\n")
+        out.append(f"   ALERT GENERATED")
+        out.append(f"   ID: {alert.alert_id}")
+        out.append(f"   Confidence: {alert.confidence}/100")
+        out.append(f"   Signals detected: {len(alert.signals)}\n")
         
         # Investigate
-        result = orchestrator.investigate(alert, dry_run=False)
-        print(orchestrator.get_human_summary(result))
+        result = await orchestrator.investigate(alert, dry_run=False)
+        out.append(orchestrator.get_human_summary(result))
     else:
-        print("  No alert generated (unexpected)")
+        out.append("  No alert generated (unexpected)")
+    
+    return "\n".join(out)
 
 
-def scenario_privilege_escalation():
+async def scenario_privilege_escalation():
     """
     Scenario 3: Privilege Escalation Attempt
     
@@ -141,9 +149,10 @@ def scenario_privilege_escalation():
     - Unauthorized role changes
     - Admin command execution
     """
-    print("\n" + "="*70)
-    print(" Privilege Escalation")
-    print("="*70 + "\n")
+    out = []
+    out.append("\n" + "="*70)
+    out.append(" Privilege Escalation")
+    out.append("="*70 + "\n")
     
     detector = PrivilegeEscalationDetector()
     orchestrator = AgentOrchestrator()
@@ -184,19 +193,21 @@ def scenario_privilege_escalation():
     alert = detector.detect(logs, user_profile)
     
     if alert:
-        print(f"   ALERT GENERATED")
-        print(f"   ID: {alert.alert_id}")
-        print(f"   Confidence: {alert.confidence}/100")
-        print(f"   Signals detected: {len(alert.signals)}\n")
+        out.append(f"   ALERT GENERATED")
+        out.append(f"   ID: {alert.alert_id}")
+        out.append(f"   Confidence: {alert.confidence}/100")
+        out.append(f"   Signals detected: {len(alert.signals)}\n")
         
         # Investigate
-        result = orchestrator.investigate(alert, dry_run=False)
-        print(orchestrator.get_human_summary(result))
+        result = await orchestrator.investigate(alert, dry_run=False)
+        out.append(orchestrator.get_human_summary(result))
     else:
-        print("  No alert generated (unexpected)")
+        out.append("  No alert generated (unexpected)")
+    
+    return "\n".join(out)
 
 
-def scenario_false_positive():
+async def scenario_false_positive():
     """
     Scenario 4: False Positive (Traveling Employee)
     
@@ -204,9 +215,10 @@ def scenario_false_positive():
     Should generate alert but with lower confidence
     Demonstrates system's ability to identify ambiguous cases
     """
-    print("\n" + "="*70)
-    print("SCENARIO 4: Potential False Positive (Traveling Employee)")
-    print("="*70 + "\n")
+    out = []
+    out.append("\n" + "="*70)
+    out.append("SCENARIO 4: Potential False Positive (Traveling Employee)")
+    out.append("="*70 + "\n")
     
     detector = SuspiciousLoginDetector()
     orchestrator = AgentOrchestrator()
@@ -235,17 +247,64 @@ def scenario_false_positive():
     alert = detector.detect(logs, user_profile)
     
     if alert:
-        print(f"   ALERT GENERATED")
-        print(f"   ID: {alert.alert_id}")
-        print(f"   Confidence: {alert.confidence}/100")
-        print(f"   Signals detected: {len(alert.signals)}\n")
-        print(f"   NOTE: This should have lower confidence and likely escalate to human\n")
+        out.append(f"   ALERT GENERATED")
+        out.append(f"   ID: {alert.alert_id}")
+        out.append(f"   Confidence: {alert.confidence}/100")
+        out.append(f"   Signals detected: {len(alert.signals)}\n")
+        out.append(f"   NOTE: This should have lower confidence and likely escalate to human\n")
         
         # Investigate
-        result = orchestrator.investigate(alert, dry_run=False)
-        print(orchestrator.get_human_summary(result))
+        result = await orchestrator.investigate(alert, dry_run=False)
+        out.append(orchestrator.get_human_summary(result))
     else:
-        print("  No alert generated")
+        out.append("  No alert generated")
+    
+    return "\n".join(out)
+
+
+async def run_scenarios(scenario_funcs, max_concurrency: int = 8):
+    """Run scenario coroutines concurrently; failures are returned, not raised"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def run(func):
+        async with semaphore:
+            return await func()
+    
+    return await asyncio.gather(*[run(func) for func in scenario_funcs], return_exceptions=True)
+
+
+def _run_scenario_in_process(scenario_func) -> str:
+    """Worker entry point: run one scenario, returning its report plus any stray stdout"""
+    stdout = io.StringIO()
+    with redirect_stdout(stdout):
+        report = asyncio.run(scenario_func())
+    return stdout.getvalue() + report
+
+
+def run_scenarios_in_processes(scenario_funcs) -> list:
+    """
+    Run each scenario in its own worker process
+    
+    Used for non-interactive runs (CI, benchmarks): detection is CPU-bound
+    Python, so separate processes keep scenarios from contending for the GIL.
+    Results come back in scenario order; failures are returned, not raised.
+    """
+    results = [None] * len(scenario_funcs)
+    with ProcessPoolExecutor(
+        max_workers=len(scenario_funcs),
+        initializer=configure_logging,
+        initargs=(logging.INFO, '%(message)s')
+    ) as pool:
+        futures = {
+            pool.submit(_run_scenario_in_process, func): i
+            for i, func in enumerate(scenario_funcs)
+        }
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                results[futures[future]] = e
+    return results
 
 
 def main():
@@ -261,15 +320,26 @@ def main():
         ("False Positive Case", scenario_false_positive)
     ]
     
-    for name, scenario_func in scenarios:
-        try:
-            scenario_func()
-        except Exception as e:
-            print(f"\n Error in scenario '{name}': {str(e)}\n")
+    interactive = not os.getenv("DEMO_NONINTERACTIVE")
+    
+    # Scenarios are independent, so their investigations (and LLM calls)
+    # run concurrently; output is still shown one scenario at a time
+    scenario_funcs = [func for _, func in scenarios]
+    if interactive:
+        results = asyncio.run(run_scenarios(scenario_funcs))
+    else:
+        results = run_scenarios_in_processes(scenario_funcs)
+    
+    for (name, _), result in zip(scenarios, results):
+        if isinstance(result, Exception):
+            print(f"\n Error in scenario '{name}': {str(result)}\n")
             import traceback
-            traceback.print_exc()
+            traceback.print_exception(result)
+        else:
+            print(result)
         
-        input("\nPress Enter to continue to next scenario...")
+        if interactive:
+            input("\nPress Enter to continue to next scenario...")
     
     print("\n" + "="*70)
     print("   All scenarios completed!")
@@ -0,0 +1,62 @@
+"""
+Logging Setup
+Non-blocking logging: callers enqueue records, a background thread does the I/O
+"""
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+import atexit
+import logging
+import queue
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(
+    level: int = logging.INFO,
+    format: str = '%(message)s',
+    handlers: Optional[List[logging.Handler]] = None
+) -> QueueListener:
+    """
+    Route root logging through a queue drained by a QueueListener thread
+
+    The investigation path logs a dozen lines per alert; with a slow
+    terminal or disk each write can block for milliseconds. Here a log
+    call only pushes the record onto a SimpleQueue, and the listener
+    thread formats and writes it to the real handlers (stderr by default).
+
+    Replaces logging.basicConfig in entry points. Safe to call again: the
+    previous listener is stopped (and flushed) first. The listener is also
+    stopped at interpreter exit so queued records aren't lost.
+    """
+    global _listener
+    stop_logging()
+
+    if handlers is None:
+        handlers = [logging.StreamHandler()]
+    formatter = logging.Formatter(format)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
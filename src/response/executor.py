@@ -2,11 +2,19 @@
 Response Action Executor
 Safely executes security actions with multiple layers of safety checks
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from enum import Enum
+from types import MappingProxyType
 import logging
+import sys
+import threading
+import time
+
+import numpy as np
+
+from src.agents.cache import TTLCache
 
 
 logger = logging.getLogger(__name__)
@@ -14,6 +22,13 @@ logger = logging.getLogger(__name__)
 
 class ActionType(Enum):
     """Available response actions, ordered by severity"""
+    
+    def __new__(cls, value):
+        member = object.__new__(cls)
+        member._value_ = value
+        member.ordinal = len(cls.__members__)  # Severity rank, 0 = LOG_ONLY
+        return member
+    
     LOG_ONLY = "log_only"
     RATE_LIMIT = "rate_limit"
     REQUIRE_MFA = "require_mfa"
@@ -41,21 +56,48 @@ class ExecutionStatus(Enum):
     FAILED = "failed"
 
 
-@dataclass
+# Enum value strings for hot paths; a dict probe skips Enum's .value descriptor
+_ACTION_TYPE_VALUE = {t: sys.intern(t.value) for t in ActionType}
+_BLAST_RADIUS_VALUE = {b: sys.intern(b.value) for b in BlastRadius}
+_STATUS_VALUE = {s: sys.intern(s.value) for s in ExecutionStatus}
+
+
+@dataclass(slots=True, frozen=True)
+class Target:
+    """Entities an action applies to; unused fields stay None"""
+    user_id: Optional[str] = None
+    ip: Optional[str] = None
+    api_key_id: Optional[str] = None
+    
+    @classmethod
+    def from_entities(cls, entities: Dict[str, str]) -> "Target":
+        """Pick the actionable entities out of an alert's affected_entities"""
+        return cls(entities.get("user_id"), entities.get("ip"), entities.get("api_key_id"))
+
+
+@dataclass(slots=True, frozen=True)
 class Action:
-    """Proposed security action"""
+    """Proposed security action; immutable once proposed"""
     action_id: str
     action_type: ActionType
-    target: Dict[str, str]  # user_id, ip, resource, etc.
+    target: Target
     confidence: int  # From detection + reasoning
     blast_radius: BlastRadius
     reversible: bool
-    auto_expire: Optional[timedelta]  # Auto-rollback after duration
+    auto_expire: Optional[int]  # Auto-rollback after this many seconds
     justification: str  # Human-readable explanation
     metadata: Dict  # Additional context
+    
+    # Display strings for analyst summaries
+    action_type_str: str = field(init=False, repr=False, compare=False)
+    blast_radius_str: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "action_type_str", _ACTION_TYPE_VALUE[self.action_type].upper())
+        object.__setattr__(self, "blast_radius_str", _BLAST_RADIUS_VALUE[self.blast_radius])
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionResult:
     """Result of attempting to execute an action"""
     action_id: str
@@ -64,6 +106,11 @@ class ExecutionResult:
     reason: str  # Why approved/rejected/escalated
     analyst_id: Optional[str]  # Who approved (if human involved)
     rollback_by: Optional[datetime]  # When auto-rollback happens
+    
+    status_str: str = field(init=False, repr=False, compare=False)  # For display
+    
+    def __post_init__(self):
+        self.status_str = _STATUS_VALUE[self.status].upper()
 
 
 class ActionExecutor:
@@ -79,25 +126,42 @@ class ActionExecutor:
     """
     
     def __init__(self):
+        # Recent verdicts for duplicate proposals (retries, repeated alerts)
+        self.verdict_cache = TTLCache(maxsize=1024, ttl=5)
+        
+        # Narrow locks so concurrent evaluate_action callers only serialize
+        # on the shared counters/cache, not on the whole evaluation
+        self._rate_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        
         # Allowlisted entities never auto-actioned
         self.protected_entities = {
             "user_ids": {"exec-001", "exec-002", "on-call-001"},  # Executives, on-call
             "service_accounts": {"svc-payments", "svc-critical-infra"}
         }
+        self.refresh_protected_entities()
         
         # Rate limiting for actions
         self.action_rate_limits = {
             "per_hour": 100,
             "per_minute": 10
         }
-        self.recent_actions = []  # Track for rate limiting
+        # Sliding-window counters, one per limit: only the previous and
+        # current fixed window counts are kept; the previous one is weighted
+        # by how much of it still overlaps the trailing window
+        now = time.monotonic()
+        self._rate_windows = {
+            "per_hour": {"window": 3600, "prev": 0, "curr": 0, "start": now},
+            "per_minute": {"window": 60, "prev": 0, "curr": 0, "start": now}
+        }
         
-        # Circuit breaker state
-        self.circuit_breaker_tripped = False
+        # Circuit breaker state; an Event so concurrent evaluators read it without locking
+        self._breaker = threading.Event()
         self.false_positive_rate_threshold = 0.20  # 20%
         
-        # Confidence thresholds for auto-execution
-        self.auto_exec_thresholds = {
+        # Confidence thresholds for auto-execution; read-only, change them
+        # with set_auto_exec_threshold so the hot-path copy stays in sync
+        self._auto_exec_thresholds = {
             ActionType.LOG_ONLY: 0,
             ActionType.RATE_LIMIT: 70,
             ActionType.REQUIRE_MFA: 80,
@@ -107,6 +171,25 @@ class ActionExecutor:
             ActionType.REVOKE_API_KEY: 90,
             ActionType.DISABLE_SERVICE_ACCOUNT: 99  # Almost never auto
         }
+        self.auto_exec_thresholds = MappingProxyType(self._auto_exec_thresholds)
+        # Same thresholds indexed by ActionType.ordinal for the hot path
+        self._thresholds = tuple(self._auto_exec_thresholds[t] for t in ActionType)
+        
+        # Action handlers and what they take: the Target field first, then
+        # any Action fields, in call order
+        self._dispatch = {
+            ActionType.BLOCK_IP: (self._block_ip, ("ip", "auto_expire")),
+            ActionType.LOCK_ACCOUNT: (self._lock_account, ("user_id",)),
+            ActionType.REVOKE_SESSION: (self._revoke_sessions, ("user_id",)),
+            ActionType.RATE_LIMIT: (self._apply_rate_limit, ("ip",)),
+            ActionType.REQUIRE_MFA: (self._require_mfa, ("user_id",)),
+            ActionType.REVOKE_API_KEY: (self._revoke_api_key, ("api_key_id",)),
+            ActionType.DISABLE_SERVICE_ACCOUNT: (self._disable_service_account, ("user_id",))
+        }
+    
+    @property
+    def circuit_breaker_tripped(self) -> bool:
+        return self._breaker.is_set()
     
     def evaluate_action(
         self,
@@ -117,70 +200,144 @@ class ActionExecutor:
         Evaluate whether action should be executed, escalated, or rejected
         
         Multi-layer safety checks:
-        1. Confidence threshold
-        2. Blast radius check
-        3. Protected entity check
-        4. Rate limit check
-        5. Circuit breaker check
+        1. Circuit breaker check (first, so a tripped breaker fails fast)
+        2. Confidence threshold
+        3. Blast radius check
+        4. Protected entity check
+        5. Rate limit check
+        
+        Verdicts that did no work (escalated, rejected, dry-run approved)
+        are remembered for a few seconds per (action type, target,
+        confidence, blast radius), so a retried or duplicate proposal gets
+        the same result without re-running the checks. Executions are
+        never replayed: a duplicate is checked, rate limited and executed
+        like any other action.
         """
-        # Check 1: Confidence threshold
-        if not self._passes_confidence_threshold(action):
+        return self._remember(action, dry_run, self._evaluate)
+    
+    def _evaluate(self, action: Action, dry_run: bool) -> ExecutionResult:
+        """Run the safety checks in order; see evaluate_action"""
+        # Check 1: Circuit breaker
+        if self.circuit_breaker_tripped:
             return ExecutionResult(
                 action_id=action.action_id,
                 status=ExecutionStatus.ESCALATED,
                 executed_at=None,
-                reason=f"Confidence {action.confidence} below threshold {self.auto_exec_thresholds[action.action_type]} for {action.action_type.value}",
+                reason="Circuit breaker tripped due to high false positive rate",
                 analyst_id=None,
                 rollback_by=None
             )
         
-        # Check 2: Blast radius
-        if not self._passes_blast_radius_check(action):
+        # Check 2: Confidence threshold
+        if not self._passes_confidence_threshold(action):
             return ExecutionResult(
                 action_id=action.action_id,
                 status=ExecutionStatus.ESCALATED,
                 executed_at=None,
-                reason=f"Blast radius {action.blast_radius.value} requires human approval",
+                reason=f"Confidence {action.confidence} below threshold {self._thresholds[action.action_type.ordinal]} for {_ACTION_TYPE_VALUE[action.action_type]}",
                 analyst_id=None,
                 rollback_by=None
             )
         
-        # Check 3: Protected entities
-        if not self._passes_allowlist_check(action):
+        # Check 3: Blast radius
+        if not self._passes_blast_radius_check(action):
             return ExecutionResult(
                 action_id=action.action_id,
                 status=ExecutionStatus.ESCALATED,
                 executed_at=None,
-                reason=f"Target {action.target} is protected, requires human approval",
+                reason=f"Blast radius {_BLAST_RADIUS_VALUE[action.blast_radius]} requires human approval",
                 analyst_id=None,
                 rollback_by=None
             )
         
-        # Check 4: Rate limits
-        if not self._passes_rate_limit(action):
+        # Check 4: Protected entities
+        if not self._passes_allowlist_check(action):
             return ExecutionResult(
                 action_id=action.action_id,
-                status=ExecutionStatus.REJECTED,
+                status=ExecutionStatus.ESCALATED,
                 executed_at=None,
-                reason=f"Rate limit exceeded: {len(self.recent_actions)} actions in last hour",
+                reason=f"Target {action.target} is protected, requires human approval",
                 analyst_id=None,
                 rollback_by=None
             )
         
-        # Check 5: Circuit breaker
+        return self._admit(action, dry_run)
+    
+    def evaluate_actions_batch(
+        self,
+        actions: List[Action],
+        dry_run: bool = False
+    ) -> List[ExecutionResult]:
+        """
+        Evaluate a queue of actions, same results as evaluate_action on each in order
+        
+        For incident storms with thousands of proposed actions: the
+        stateless checks (confidence, blast radius, protected entity) are
+        computed for the whole batch as one boolean mask; only actions
+        that pass go through the rate limit and execution one by one.
+        """
+        if not actions:
+            return []
         if self.circuit_breaker_tripped:
+            return [self.evaluate_action(action, dry_run) for action in actions]
+        
+        ordinals = np.fromiter((a.action_type.ordinal for a in actions), dtype=np.intp, count=len(actions))
+        confidences = np.fromiter((a.confidence for a in actions), dtype=np.float64, count=len(actions))
+        passes = confidences >= np.asarray(self._thresholds)[ordinals]
+        passes &= np.fromiter(
+            (a.blast_radius is BlastRadius.SINGLE_USER for a in actions), dtype=bool, count=len(actions)
+        )
+        passes &= np.fromiter(
+            (a.target.user_id not in self._all_protected for a in actions), dtype=bool, count=len(actions)
+        )
+        
+        # Failed actions re-run evaluate_action so escalation reasons stay identical
+        return [
+            self._remember(action, dry_run, self._admit) if passed else self.evaluate_action(action, dry_run)
+            for action, passed in zip(actions, passes.tolist())
+        ]
+    
+    def _remember(
+        self,
+        action: Action,
+        dry_run: bool,
+        evaluate: Callable[[Action, bool], ExecutionResult]
+    ) -> ExecutionResult:
+        """Return the cached verdict for an identical recent action, or evaluate it"""
+        key = (action.action_type, action.confidence, action.target, action.blast_radius, dry_run)
+        with self._cache_lock:
+            cached = self.verdict_cache.get(key)
+        if cached is not None:
+            return replace(cached, action_id=action.action_id)
+        
+        result = evaluate(action, dry_run)
+        # Executed results describe work done for this action only, and
+        # failures may be transient; neither is replayed
+        if result.status not in (ExecutionStatus.EXECUTED, ExecutionStatus.FAILED):
+            with self._cache_lock:
+                self.verdict_cache.set(key, replace(result))
+        return result
+    
+    def _admit(self, action: Action, dry_run: bool) -> ExecutionResult:
+        """Rate limit, then execute (or report a dry run) an action that passed the other checks"""
+        # Check 5: Rate limits. A real execution reserves its slot in the
+        # same critical section as the check, so concurrent callers can't
+        # all pass before any of them is counted; dry runs only check
+        exceeded = self._rate_limit_exceeded(reserve=not dry_run)
+        if exceeded:
+            logger.warning("%s rate limit exceeded", exceeded.capitalize())
             return ExecutionResult(
                 action_id=action.action_id,
-                status=ExecutionStatus.ESCALATED,
+                status=ExecutionStatus.REJECTED,
                 executed_at=None,
-                reason="Circuit breaker tripped due to high false positive rate",
+                reason=f"Rate limit exceeded: {exceeded} action budget used",
                 analyst_id=None,
                 rollback_by=None
             )
         
         # All checks passed - approve for execution
         if dry_run:
-            logger.info(f"[DRY RUN] Would execute {action.action_type.value} on {action.target}")
+            logger.info("[DRY RUN] Would execute %s on %s", _ACTION_TYPE_VALUE[action.action_type], action.target)
             return ExecutionResult(
                 action_id=action.action_id,
                 status=ExecutionStatus.APPROVED,
@@ -190,60 +347,97 @@ class ActionExecutor:
                 rollback_by=None
             )
         else:
-            return self._execute(action)
+            return self._execute(action, reserved=True)
     
     def _passes_confidence_threshold(self, action: Action) -> bool:
         """Check if confidence meets threshold for automatic execution"""
-        threshold = self.auto_exec_thresholds[action.action_type]
-        return action.confidence >= threshold
+        return action.confidence >= self._thresholds[action.action_type.ordinal]
+    
+    def set_auto_exec_threshold(self, action_type: ActionType, threshold: int):
+        """Change the confidence an action type needs to auto-execute"""
+        self._auto_exec_thresholds[action_type] = threshold
+        self._thresholds = tuple(self._auto_exec_thresholds[t] for t in ActionType)
+        # Remembered verdicts were checked against the old threshold
+        with self._cache_lock:
+            self.verdict_cache.clear()
     
     def _passes_blast_radius_check(self, action: Action) -> bool:
         """Only single-user actions can auto-execute"""
         return action.blast_radius == BlastRadius.SINGLE_USER
     
+    def refresh_protected_entities(self):
+        """Rebuild the allowlist lookup; call after changing protected_entities"""
+        # Service accounts only count as protected under the svc- prefix
+        self._all_protected = frozenset(self.protected_entities["user_ids"]) | frozenset(
+            account for account in self.protected_entities["service_accounts"]
+            if account.startswith("svc-")
+        )
+        # Remembered verdicts were checked against the old allowlist
+        with self._cache_lock:
+            self.verdict_cache.clear()
+    
     def _passes_allowlist_check(self, action: Action) -> bool:
         """Protected entities require human approval"""
-        user_id = action.target.get("user_id")
-        
-        if user_id in self.protected_entities["user_ids"]:
-            return False
-        
-        if user_id and user_id.startswith("svc-"):
-            if user_id in self.protected_entities["service_accounts"]:
-                return False
-        
-        return True
+        return action.target.user_id not in self._all_protected
     
-    def _passes_rate_limit(self, action: Action) -> bool:
-        """Prevent too many actions in short time window"""
-        now = datetime.now()
-        
-        # Clean up old actions
-        self.recent_actions = [
-            a for a in self.recent_actions
-            if now - a["timestamp"] < timedelta(hours=1)
-        ]
-        
-        # Check hourly limit
-        if len(self.recent_actions) >= self.action_rate_limits["per_hour"]:
-            logger.warning(f"Hourly rate limit exceeded: {len(self.recent_actions)} actions")
-            return False
-        
-        # Check per-minute limit
-        recent_minute = [
-            a for a in self.recent_actions
-            if now - a["timestamp"] < timedelta(minutes=1)
-        ]
-        if len(recent_minute) >= self.action_rate_limits["per_minute"]:
-            logger.warning(f"Per-minute rate limit exceeded: {len(recent_minute)} actions")
-            return False
+    def _roll_rate_windows(self) -> float:
+        """Advance each counter to the fixed window containing now (caller holds _rate_lock)"""
+        now = time.monotonic()
+        for tier in self._rate_windows.values():
+            elapsed = now - tier["start"]
+            if elapsed >= tier["window"]:
+                shifts = int(elapsed // tier["window"])
+                # A gap longer than one window leaves nothing to carry over
+                tier["prev"] = tier["curr"] if shifts == 1 else 0
+                tier["curr"] = 0
+                tier["start"] += shifts * tier["window"]
+        return now
+    
+    def _rate_limit_exceeded(self, reserve: bool = False) -> Optional[str]:
+        """
+        Which window ("hourly"/"per-minute") has no room for one more action, or None
         
-        return True
+        With reserve, a passing check also counts the action against both
+        windows before the lock is released; release the slot with
+        _release_rate_limited_action if the action then fails.
+        """
+        with self._rate_lock:
+            now = self._roll_rate_windows()
+            for name, label in (("per_hour", "hourly"), ("per_minute", "per-minute")):
+                tier = self._rate_windows[name]
+                weight = 1 - (now - tier["start"]) / tier["window"]
+                if tier["prev"] * weight + tier["curr"] + 1 > self.action_rate_limits[name]:
+                    return label
+            if reserve:
+                for tier in self._rate_windows.values():
+                    tier["curr"] += 1
+            return None
+    
+    def _record_rate_limited_action(self):
+        """Count one executed action against both windows"""
+        with self._rate_lock:
+            self._roll_rate_windows()
+            for tier in self._rate_windows.values():
+                tier["curr"] += 1
+    
+    def _release_rate_limited_action(self):
+        """Give back a reserved slot whose action didn't execute"""
+        with self._rate_lock:
+            self._roll_rate_windows()
+            for tier in self._rate_windows.values():
+                # The slot moved to prev if its window rolled over meanwhile
+                if tier["curr"]:
+                    tier["curr"] -= 1
+                elif tier["prev"]:
+                    tier["prev"] -= 1
     
-    def _execute(self, action: Action) -> ExecutionResult:
+    def _execute(self, action: Action, reserved: bool = False) -> ExecutionResult:
         """
         Actually execute the security action
         
+        reserved: the rate-limit slot was taken by the check in _admit;
+        otherwise (human approval) the action is counted on success
+        
         In production, this would:
         - Call firewall API to block IP
         - Call IAM API to revoke credentials
@@ -255,36 +449,26 @@ class ActionExecutor:
         now = datetime.now()
         
         try:
-            # Execute based on action type
-            if action.action_type == ActionType.BLOCK_IP:
-                self._block_ip(action.target["ip"], action.auto_expire)
-            elif action.action_type == ActionType.LOCK_ACCOUNT:
-                self._lock_account(action.target["user_id"])
-            elif action.action_type == ActionType.REVOKE_SESSION:
-                self._revoke_sessions(action.target["user_id"])
-            elif action.action_type == ActionType.RATE_LIMIT:
-                self._apply_rate_limit(action.target["ip"])
-            elif action.action_type == ActionType.REQUIRE_MFA:
-                self._require_mfa(action.target["user_id"])
-            elif action.action_type == ActionType.REVOKE_API_KEY:
-                self._revoke_api_key(action.target["api_key_id"])
-            elif action.action_type == ActionType.DISABLE_SERVICE_ACCOUNT:
-                self._disable_service_account(action.target["user_id"])
+            # Execute based on action type (LOG_ONLY has no handler)
+            entry = self._dispatch.get(action.action_type)
+            if entry:
+                handler, keys = entry
+                entity, *extra = keys
+                value = getattr(action.target, entity)
+                if value is None:
+                    raise ValueError(f"target has no {entity}")
+                handler(value, *[getattr(action, key) for key in extra])
             
             # Record action for rate limiting
-            self.recent_actions.append({
-                "action_id": action.action_id,
-                "timestamp": now,
-                "action_type": action.action_type,
-                "target": action.target
-            })
+            if not reserved:
+                self._record_rate_limited_action()
             
             # Calculate rollback time
             rollback_by = None
             if action.auto_expire:
-                rollback_by = now + action.auto_expire
+                rollback_by = now + timedelta(seconds=action.auto_expire)
             
-            logger.info(f"   Executed {action.action_type.value} on {action.target}")
+            logger.info("   Executed %s on %s", _ACTION_TYPE_VALUE[action.action_type], action.target)
             
             return ExecutionResult(
                 action_id=action.action_id,
@@ -296,7 +480,9 @@ class ActionExecutor:
             )
             
         except Exception as e:
-            logger.error(f"  Failed to execute {action.action_type.value}: {str(e)}")
+            if reserved:
+                self._release_rate_limited_action()
+            logger.error("  Failed to execute %s: %s", _ACTION_TYPE_VALUE[action.action_type], e)
             return ExecutionResult(
                 action_id=action.action_id,
                 status=ExecutionStatus.FAILED,
@@ -321,10 +507,8 @@ class ActionExecutor:
         - Reject it (false positive)
         - Modify it (e.g., shorter duration, different target)
         """
-        now = datetime.now()
-        
         if not approved:
-            logger.info(f"  Action {action.action_id} rejected by analyst {analyst_id}")
+            logger.info("  Action %s rejected by analyst %s", action.action_id, analyst_id)
             return ExecutionResult(
                 action_id=action.action_id,
                 status=ExecutionStatus.REJECTED,
@@ -336,7 +520,7 @@ class ActionExecutor:
         
         # Human approved - execute without safety checks
         # (Analyst has already reviewed)
-        logger.info(f"   Action {action.action_id} approved by analyst {analyst_id}")
+        logger.info("   Action %s approved by analyst %s", action.action_id, analyst_id)
         result = self._execute(action)
         result.analyst_id = analyst_id
         result.reason = override_reason or "Approved by human analyst"
@@ -352,7 +536,7 @@ class ActionExecutor:
         - Accounts are unlocked
         - Sessions can be restored (within 7-day window)
         """
-        logger.info(f"🔄 Rolling back action {action_id}: {reason}")
+        logger.info("🔄 Rolling back action %s: %s", action_id, reason)
         
         # In production, this would:
         # - Lookup original action from database
@@ -373,53 +557,80 @@ class ActionExecutor:
         Disable automatic actions due to high false positive rate
         All future actions will escalate to humans
         """
-        self.circuit_breaker_tripped = True
-        logger.critical(f"    CIRCUIT BREAKER TRIPPED: {reason}")
+        self._breaker.set()
+        with self._cache_lock:
+            self.verdict_cache.clear()
+        logger.critical("    CIRCUIT BREAKER TRIPPED: %s", reason)
         logger.critical("All automatic actions disabled. Human approval required.")
     
     def reset_circuit_breaker(self, analyst_id: str):
         """Re-enable automatic actions after circuit breaker trip"""
-        self.circuit_breaker_tripped = False
-        logger.info(f"   Circuit breaker reset by {analyst_id}")
-    
+        self._breaker.clear()
+        with self._cache_lock:
+            self.verdict_cache.clear()
+        logger.info("   Circuit breaker reset by %s", analyst_id)
+
+    def reset(self):
+        """
+        Clear runtime state: rate-limit counters, verdict cache, circuit breaker
+        Configuration (thresholds, limits, protected entities) is kept
+        """
+        now = time.monotonic()
+        with self._rate_lock:
+            for counter in self._rate_windows.values():
+                counter.update(prev=0, curr=0, start=now)
+        self._breaker.clear()
+        with self._cache_lock:
+            self.verdict_cache.clear()
+
     # Individual action implementations (would integrate with real systems)
     
-    def _block_ip(self, ip: str, duration: Optional[timedelta]):
-        """Add IP to firewall blocklist"""
-        logger.info(f"  Blocking IP {ip} for {duration}")
+    def _block_ip(self, ip: str, duration: Optional[int]):
+        """Add IP to firewall blocklist for duration seconds (None = until removed)"""
+        logger.info("  Blocking IP %s for %ss", ip, duration)
         # In production: call firewall API
     
     def _lock_account(self, user_id: str):
         """Disable account, requiring manual unlock"""
-        logger.info(f" Locking account {user_id}")
+        logger.info(" Locking account %s", user_id)
         # In production: call IAM API
     
     def _revoke_sessions(self, user_id: str):
         """Kill all active sessions for user"""
-        logger.info(f"  Revoking sessions for {user_id}")
+        logger.info("  Revoking sessions for %s", user_id)
         # In production: call session management API
     
     def _apply_rate_limit(self, ip: str):
         """Reduce request rate for IP"""
-        logger.info(f"  Applying rate limit to {ip}")
+        logger.info("  Applying rate limit to %s", ip)
         # In production: call API gateway
     
     def _require_mfa(self, user_id: str):
         """Force MFA on next login"""
-        logger.info(f" Requiring MFA for {user_id}")
+        logger.info(" Requiring MFA for %s", user_id)
         # In production: update user profile
     
     def _revoke_api_key(self, api_key_id: str):
         """Invalidate API key"""
-        logger.info(f"  Revoking API key {api_key_id}")
+        logger.info("  Revoking API key %s", api_key_id)
         # In production: call API key service
     
     def _disable_service_account(self, user_id: str):
         """Disable service account credentials"""
-        logger.info(f"  Disabling service account {user_id}")
+        logger.info("  Disabling service account %s", user_id)
         # In production: call service account manager
 
 
+# Recommendation -> (action, auto-expire, minimum confidence), highest priority first
+_RECO_MAP: Tuple[Tuple[str, ActionType, Optional[int], int], ...] = (
+    ("Block IP address immediately", ActionType.BLOCK_IP, 3600, 90),  # Auto-unblock after 1 hour
+    ("Lock affected account", ActionType.LOCK_ACCOUNT, None, 95),  # Requires manual unlock
+    ("Revoke all active sessions", ActionType.REVOKE_SESSION, None, 85),
+    ("Rate limit IP address", ActionType.RATE_LIMIT, 7200, 0),
+    ("Require MFA for next login", ActionType.REQUIRE_MFA, None, 0),
+)
+
+
 def generate_action_from_assessment(
     alert,
     risk_assessment,
@@ -432,25 +643,14 @@ def generate_action_from_assessment(
     recommendations = risk_assessment.recommended_actions
     confidence = risk_assessment.risk_score
     
-    # Select primary action based on recommendations and confidence
-    action_type = ActionType.LOG_ONLY  # Safe default
-    auto_expire = None
-    
-    if "Block IP address immediately" in recommendations and confidence >= 90:
-        action_type = ActionType.BLOCK_IP
-        auto_expire = timedelta(hours=1)  # Auto-unblock after 1 hour
-    elif "Lock affected account" in recommendations and confidence >= 95:
-        action_type = ActionType.LOCK_ACCOUNT
-        auto_expire = None  # Requires manual unlock
-    elif "Revoke all active sessions" in recommendations and confidence >= 85:
-        action_type = ActionType.REVOKE_SESSION
-        auto_expire = None
-    elif "Rate limit IP address" in recommendations:
-        action_type = ActionType.RATE_LIMIT
-        auto_expire = timedelta(hours=2)
-    elif "Require MFA for next login" in recommendations:
-        action_type = ActionType.REQUIRE_MFA
-        auto_expire = None
+    # Select primary action: first entry in priority order that was
+    # recommended with enough confidence, else the safe default
+    recommended = set(recommendations)
+    action_type, auto_expire = ActionType.LOG_ONLY, None
+    for recommendation, candidate, expire, min_confidence in _RECO_MAP:
+        if recommendation in recommended and confidence >= min_confidence:
+            action_type, auto_expire = candidate, expire
+            break
     
     # Determine blast radius
     affected_user = alert.affected_entities.get("user_id")
@@ -462,7 +662,7 @@ def generate_action_from_assessment(
     return Action(
         action_id=action_id,
         action_type=action_type,
-        target=alert.affected_entities,
+        target=Target.from_entities(alert.affected_entities),
         confidence=confidence,
         blast_radius=blast_radius,
         reversible=action_type != ActionType.LOCK_ACCOUNT,
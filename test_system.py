@@ -4,15 +4,27 @@ Quick test to verify the threat detection system works
 Run this after setup to confirm everything is functioning
 """
 
+import asyncio
 import sys
 from datetime import datetime
 
+# Imported once up front; a broken install is reported by each check below
+try:
+    from src.agents.context import ContextAgent, MockStorageClient
+    from src.agents.reasoning import ReasoningAgent
+    from src.detection.rules import Alert, Severity, Signal, SuspiciousLoginDetector, ThreatType
+    from src.response.executor import Action, ActionExecutor, ActionType, BlastRadius, Target
+    _IMPORT_ERROR = None
+except ImportError as e:
+    _IMPORT_ERROR = e
+
 
 def test_detection():
     """Test detection engine"""
     print("🔍 Testing Detection Engine...")
     
-    from src.detection.rules import SuspiciousLoginDetector
+    if _IMPORT_ERROR:
+        raise _IMPORT_ERROR
     
     detector = SuspiciousLoginDetector()
     
@@ -44,9 +56,8 @@ def test_agents():
     """Test AI agents"""
     print("\n Testing AI Agents...")
     
-    from src.agents.reasoning import ReasoningAgent
-    from src.agents.context import ContextAgent, MockStorageClient
-    from src.detection.rules import Alert, ThreatType, Severity, Signal
+    if _IMPORT_ERROR:
+        raise _IMPORT_ERROR
     
     # Create mock alert
     alert = Alert(
@@ -64,7 +75,7 @@ def test_agents():
     
     # Test context agent
     context_agent = ContextAgent(MockStorageClient())
-    context = context_agent.enrich(alert)
+    context = asyncio.run(context_agent.enrich(alert))
     
     if context.user_profile:
         print("   Context Agent working")
@@ -74,7 +85,7 @@ def test_agents():
     
     # Test reasoning agent
     reasoning_agent = ReasoningAgent()
-    assessment = reasoning_agent.analyze(alert, context.__dict__)
+    assessment = asyncio.run(reasoning_agent.analyze(alert, context))
     
     if assessment.risk_score > 0:
         print("   Reasoning Agent working")
@@ -89,8 +100,8 @@ def test_executor():
     """Test action executor"""
     print("\n  Testing Action Executor...")
     
-    from src.response.executor import ActionExecutor, Action, ActionType, BlastRadius
-    from datetime import timedelta
+    if _IMPORT_ERROR:
+        raise _IMPORT_ERROR
     
     executor = ActionExecutor()
     
@@ -98,7 +109,7 @@ def test_executor():
     safe_action = Action(
         action_id="TEST-SAFE",
         action_type=ActionType.LOG_ONLY,
-        target={"user_id": "test"},
+        target=Target(user_id="test"),
         confidence=95,
         blast_radius=BlastRadius.SINGLE_USER,
         reversible=True,
@@ -119,7 +130,7 @@ def test_executor():
     unsafe_action = Action(
         action_id="TEST-UNSAFE",
         action_type=ActionType.LOCK_ACCOUNT,
-        target={"user_id": "test"},
+        target=Target(user_id="test"),
         confidence=50,  # Low confidence
         blast_radius=BlastRadius.SINGLE_USER,
         reversible=False,
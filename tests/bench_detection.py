@@ -0,0 +1,73 @@
+"""
+Microbenchmarks for Detector Hot Paths
+
+Not collected by a plain `pytest` run (the file doesn't match test_*.py).
+Run explicitly with pytest-benchmark:
+
+    pytest tests/bench_detection.py --benchmark-only
+"""
+import pytest
+from datetime import datetime, timedelta
+from src.detection.rules import SuspiciousLoginDetector, AbnormalAPIDetector
+
+
+pytest.importorskip("pytest_benchmark")
+
+
+PROFILE = {
+    "user_id": "bench-user",
+    "typical_countries": ["US"],
+    "typical_hours": list(range(9, 18)),
+    "typical_endpoints": ["/api/v1/users", "/api/v1/search"],
+    "role": "user",
+}
+
+LOGIN = {
+    "user_id": "bench-user",
+    "status": "success",
+    "ip": "1.2.3.4",
+    "country": "US",
+    "user_agent": "Chrome"
+}
+
+API_CALL = {
+    "user_id": "bench-user",
+    "endpoint": "/api/v1/search",
+    "status": 200,
+    "ip": "1.2.3.4",
+    "params": "q=quarterly+report"
+}
+
+
+@pytest.fixture(scope="module")
+def login_logs():
+    base = datetime.now()
+    return [
+        {**LOGIN, "timestamp": (base - timedelta(seconds=i)).isoformat()}
+        for i in range(10_000)
+    ]
+
+
+@pytest.fixture(scope="module")
+def api_logs():
+    # One request in a thousand carries an injection payload so the regex
+    # scan has matches to find, not just misses
+    base = datetime.now()
+    return [
+        {
+            **API_CALL,
+            "timestamp": (base - timedelta(seconds=i)).isoformat(),
+            "params": "q=' OR 1=1--" if i % 1000 == 0 else API_CALL["params"],
+        }
+        for i in range(100_000)
+    ]
+
+
+@pytest.mark.benchmark(group="detect")
+def test_bench_login_detect(benchmark, login_logs):
+    benchmark(SuspiciousLoginDetector().detect, login_logs, PROFILE)
+
+
+@pytest.mark.benchmark(group="detect")
+def test_bench_api_detect(benchmark, api_logs):
+    benchmark(AbnormalAPIDetector().detect, api_logs, PROFILE)
@@ -0,0 +1,30 @@
+"""
+Shared Test Fixtures
+"""
+import pytest
+from datetime import datetime
+from src.detection.rules import SuspiciousLoginDetector
+
+
+# Profile for make_alert: every hour is typical, so whether unusual_time
+# fires (and the alert's confidence) doesn't depend on when the tests run
+_ALERT_PROFILE = {"typical_countries": ["US"], "typical_hours": range(24)}
+
+
+@pytest.fixture
+def make_alert():
+    """Factory for a suspicious-login alert: six failed headless logins from RO"""
+    detector = SuspiciousLoginDetector()
+
+    def make(user_id: str):
+        logs = [{
+            "timestamp": datetime.now().isoformat(),
+            "user_id": user_id,
+            "status": "failed",
+            "ip": "45.67.89.12",
+            "country": "RO",
+            "user_agent": "HeadlessChrome/91.0"
+        } for _ in range(6)]
+        return detector.detect(logs, _ALERT_PROFILE)
+
+    return make
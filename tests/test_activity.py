@@ -0,0 +1,88 @@
+"""
+Unit Tests for Columnar Recent Activity
+"""
+import numpy as np
+import pytest
+from src.agents.activity import RecentActivityBatch
+from src.agents.ipv4 import NO_IP, pack_ipv4, unpack_ipv4
+from src.detection.rules import hours_mask
+
+
+class TestRecentActivityBatch:
+    """Test conversion between log rows and columns"""
+
+    def setup_method(self):
+        self.records = [
+            {
+                "timestamp": "2024-01-03T14:22:00",
+                "action": "login_success",
+                "ip": "1.2.3.4",
+                "country": "US"
+            },
+            {
+                "timestamp": "2024-01-03T14:17:00",
+                "action": "api_request",
+                "endpoint": "/api/v1/users/me",
+                "status": 200
+            },
+            {
+                "timestamp": "2024-01-03T12:22:00",
+                "action": "login_success",
+                "ip": "5.6.7.8",
+                "country": "CA"
+            }
+        ]
+
+    def test_round_trip_preserves_rows(self):
+        """Rows should come back as they went in"""
+        batch = RecentActivityBatch.from_records(self.records)
+
+        assert len(batch) == 3
+        assert batch.timestamps.dtype == np.dtype("datetime64[ns]")
+        assert batch.ips.dtype == np.uint32
+        assert [event.timestamp[:19] for event in batch] == [r["timestamp"] for r in self.records]
+        assert batch.to_records()[1] == {
+            "timestamp": "2024-01-03T14:17:00.000000",
+            "action": "api_request",
+            "endpoint": "/api/v1/users/me",
+            "status": 200
+        }
+
+    def test_vectorized_filters(self):
+        """Masks should select events by category without a Python loop"""
+        batch = RecentActivityBatch.from_records(self.records)
+
+        logins = batch.action_mask("login_success")
+        assert logins.tolist() == [True, False, True]
+        assert batch.ips[logins].tolist() == [pack_ipv4("1.2.3.4"), pack_ipv4("5.6.7.8")]
+        assert not batch.country_mask("RO").any()
+
+    def test_outside_typical_hours(self):
+        """Hour checks against a profile bitmask should vectorize over events"""
+        batch = RecentActivityBatch.from_records(self.records)
+        business_hours = hours_mask(range(9, 14))  # 9:00-14:00
+
+        assert batch.hours().tolist() == [14, 14, 12]
+        assert batch.outside_hours(business_hours).tolist() == [True, True, False]
+
+    def test_empty_batch(self):
+        batch = RecentActivityBatch.empty()
+        assert len(batch) == 0
+        assert batch.to_records() == []
+
+
+class TestIPv4Packing:
+    """Test packed IPv4 helpers"""
+
+    def test_round_trip(self):
+        assert pack_ipv4("45.67.89.12") == 0x2D43590C
+        assert unpack_ipv4(pack_ipv4("45.67.89.12")) == "45.67.89.12"
+
+    @pytest.mark.parametrize("ip", [None, "", "not-an-ip", "2001:db8::1", "1.2.3"])
+    def test_unpackable_addresses_map_to_no_ip(self, ip):
+        assert pack_ipv4(ip) == NO_IP
+        assert unpack_ipv4(NO_IP) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
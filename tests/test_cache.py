@@ -0,0 +1,119 @@
+"""
+Unit Tests for Agent Lookup Caches
+"""
+import asyncio
+import pytest
+from src.agents.cache import TTLCache, cached_lookup
+from src.agents.embedding import embed_signals, embedding_cache_info
+from src.detection.rules import Signal
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Test expiry and eviction"""
+
+    def test_entries_expire_after_ttl(self):
+        """Expired entries should be treated as misses"""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=60, timer=clock)
+        cache.set("ip", "low_risk")
+
+        clock.now = 59
+        assert cache.get("ip") == "low_risk"
+
+        clock.now = 61
+        assert cache.get("ip") is None
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 0}
+
+    def test_least_recently_used_evicted(self):
+        """Cache should never grow beyond maxsize"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+
+class TestCachedLookup:
+    """Test async memoization of agent lookups"""
+
+    def test_concurrent_lookups_share_one_call(self):
+        """Identical in-flight lookups should hit the backend once"""
+
+        class Agent:
+            def __init__(self):
+                self.cache = TTLCache(maxsize=10, ttl=60)
+                self.calls = 0
+
+            @cached_lookup("cache")
+            async def lookup(self, key):
+                self.calls += 1
+                await asyncio.sleep(0)
+                return key.upper()
+
+        agent = Agent()
+
+        async def burst():
+            return await asyncio.gather(*[agent.lookup("user-1") for _ in range(5)])
+
+        results = asyncio.run(burst())
+
+        assert results == ["USER-1"] * 5
+        assert agent.calls == 1
+        assert agent.cache.stats()["hits"] == 4
+
+    def test_failed_lookup_not_cached(self):
+        """Exceptions should propagate and leave the key uncached"""
+
+        class Agent:
+            def __init__(self):
+                self.cache = TTLCache(maxsize=10, ttl=60)
+
+            @cached_lookup("cache")
+            async def lookup(self, key):
+                raise ConnectionError("threat feed unavailable")
+
+        agent = Agent()
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(agent.lookup("1.2.3.4"))
+        assert "1.2.3.4" not in agent.cache
+        assert not agent.cache.inflight
+
+
+class TestEmbeddingCache:
+    """Test content-keyed memoization of signal embeddings"""
+
+    def test_same_signals_embedded_once(self):
+        """Signal order shouldn't matter; only names and weights do"""
+        burst = [Signal("failed_login_burst", 7, 30, "7 failed logins"),
+                 Signal("bot_user_agent", "HeadlessChrome", 30, "Bot")]
+        reordered = [Signal("bot_user_agent", "PhantomJS", 30, "Other bot"),
+                     Signal("failed_login_burst", 9, 30, "9 failed logins")]
+
+        first = embed_signals(burst)
+        misses = embedding_cache_info().misses
+        second = embed_signals(reordered)
+
+        assert second is first
+        assert embedding_cache_info().misses == misses
+
+    def test_weights_change_embedding(self):
+        a = embed_signals([Signal("impossible_travel", "US->RU", 40, ""), Signal("unusual_time", 3, 15, "")])
+        b = embed_signals([Signal("impossible_travel", "US->RU", 40, ""), Signal("unusual_time", 3, 30, "")])
+        assert a != b
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
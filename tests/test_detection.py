@@ -1,220 +1,301 @@
 """
 Unit Tests for Detection Rules
 """
+import sys
 import pytest
 from datetime import datetime, timedelta
+import src.detection.rules as rules
 from src.detection.rules import (
     SuspiciousLoginDetector,
     AbnormalAPIDetector,
     PrivilegeEscalationDetector,
+    DetectionEngine,
+    Detector,
     ThreatType,
-    Severity
+    Severity,
+    hours_mask,
+    log_epoch,
+    LogColumns
 )
 
 
+# Fixed clock for this module: log timestamps and the detectors' notion of
+# "now" agree exactly, and hour-of-day checks don't depend on when CI runs
+FROZEN_NOW = datetime(2025, 1, 1, 12, 0, 0)
+
+# ISO timestamps counting back from the frozen clock, built once for all tests:
+# MINUTES_AGO[i] is i minutes before "now", SECONDS_AGO[i] i seconds before
+MINUTES_AGO = [(FROZEN_NOW - timedelta(minutes=i)).isoformat() for i in range(31)]
+SECONDS_AGO = [(FROZEN_NOW - timedelta(seconds=i)).isoformat() for i in range(121)]
+
+
+class FrozenDateTime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return FROZEN_NOW
+
+
+@pytest.fixture(scope="module", autouse=True)
+def frozen_clock():
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(rules, "datetime", FrozenDateTime)
+        patch.setattr(sys.modules[__name__], "datetime", FrozenDateTime)
+        yield
+
+
+# Ordinary successful login; tests override the fields under test
+BASE_LOGIN = {
+    "user_id": "test-user",
+    "status": "success",
+    "ip": "1.2.3.4",
+    "country": "US",
+    "user_agent": "Chrome"
+}
+
+# Failed headless-browser login from an unexpected country
+ATTACKER_LOGIN = {**BASE_LOGIN, "status": "failed", "country": "RU", "user_agent": "HeadlessChrome/91.0"}
+
+# Ordinary API call
+BASE_API_CALL = {
+    "user_id": "test-user",
+    "endpoint": "/api/v1/users",
+    "status": 200,
+    "ip": "1.2.3.4",
+    "params": ""
+}
+
+
+# (overrides on BASE_LOGIN, log count, user profile, expected signal)
+LOGIN_SIGNAL_CASES = [
+    # Multiple failed logins (6, above threshold of 5)
+    ({"status": "failed"}, 6, None, "failed_login_burst"),
+    # Login from a country outside the profile
+    ({"country": "RU"}, 1, {"typical_countries": ["US", "CA"]}, "anomalous_geography"),
+    # Headless browser
+    ({"status": "failed", "user_agent": "HeadlessChrome/91.0"}, 1, None, "bot_user_agent"),
+]
+
+
+# Detectors hold only compiled patterns and thresholds, so one instance
+# per module is shared by every test
+@pytest.fixture(scope="module")
+def login_detector():
+    return SuspiciousLoginDetector()
+
+
+@pytest.fixture(scope="module")
+def api_detector():
+    return AbnormalAPIDetector()
+
+
+@pytest.fixture(scope="module")
+def privilege_detector():
+    return PrivilegeEscalationDetector()
+
+
 class TestSuspiciousLoginDetector:
     """Test login threat detection"""
     
-    def test_failed_login_burst_detection(self):
-        """Should detect multiple failed logins"""
-        detector = SuspiciousLoginDetector()
-        
-        # Create 6 failed logins (above threshold of 5)
-        logs = []
-        for i in range(6):
-            logs.append({
-                "timestamp": (datetime.now() - timedelta(minutes=i)).isoformat(),
-                "user_id": "test-user",
-                "status": "failed",
-                "ip": "1.2.3.4",
-                "country": "US",
-                "user_agent": "Chrome"
-            })
-        
-        alert = detector.detect(logs)
+    @pytest.mark.parametrize(
+        "overrides,count,user_profile,signal",
+        LOGIN_SIGNAL_CASES,
+        ids=[case[-1] for case in LOGIN_SIGNAL_CASES]
+    )
+    def test_single_signal_detection(self, login_detector, overrides, count, user_profile, signal):
+        """Each suspicious pattern on its own should raise its signal"""
+        logs = [{
+            **BASE_LOGIN,
+            "timestamp": MINUTES_AGO[i],
+            **overrides
+        } for i in range(count)]
+        
+        alert = login_detector.detect(logs, user_profile)
         
         assert alert is not None
         assert alert.threat_type == ThreatType.SUSPICIOUS_LOGIN
-        assert any(s.name == "failed_login_burst" for s in alert.signals)
+        assert any(s.name == signal for s in alert.signals)
         assert alert.confidence > 0
     
-    def test_no_alert_for_normal_activity(self):
+    def test_detect_batch(self, login_detector):
+        """One detect_batch call should match per-scenario detect calls"""
+        log_groups = [[{
+            **BASE_LOGIN,
+            "timestamp": MINUTES_AGO[i],
+            **overrides
+        } for i in range(count)] for overrides, count, _, _ in LOGIN_SIGNAL_CASES]
+        profiles = [user_profile for _, _, user_profile, _ in LOGIN_SIGNAL_CASES]
+        
+        # Plus a normal login that should not alert
+        log_groups.append([{**BASE_LOGIN, "timestamp": MINUTES_AGO[0]}])
+        profiles.append({"typical_countries": ["US"], "typical_hours": range(0, 24)})
+        
+        alerts = login_detector.detect_batch(log_groups, profiles)
+        
+        assert len(alerts) == len(log_groups)
+        for alert, (_, _, _, signal) in zip(alerts, LOGIN_SIGNAL_CASES):
+            assert any(s.name == signal for s in alert.signals)
+        assert alerts[-1] is None
+    
+    def test_no_alert_for_normal_activity(self, login_detector):
         """Should not alert on normal login patterns"""
-        detector = SuspiciousLoginDetector()
-        
         # Single successful login from typical location
-        logs = [{
-            "timestamp": datetime.now().isoformat(),
-            "user_id": "test-user",
-            "status": "success",
-            "ip": "1.2.3.4",
-            "country": "US",
-            "user_agent": "Chrome"
-        }]
+        logs = [{**BASE_LOGIN, "timestamp": datetime.now().isoformat()}]
         
         user_profile = {
             "typical_countries": ["US"],
             "typical_hours": range(9, 18)
         }
         
-        alert = detector.detect(logs, user_profile)
+        alert = login_detector.detect(logs, user_profile)
         
         assert alert is None
     
-    def test_anomalous_geography_detection(self):
-        """Should detect logins from unexpected countries"""
-        detector = SuspiciousLoginDetector()
-        
-        logs = [{
-            "timestamp": datetime.now().isoformat(),
-            "user_id": "test-user",
-            "status": "success",
-            "ip": "1.2.3.4",
-            "country": "RU",  # Not in typical countries
-            "user_agent": "Chrome"
-        }]
+    def test_unusual_time_uses_hours_mask(self, login_detector):
+        """Should check login hour against the profile's typical_hours_mask"""
+        logs = [{**BASE_LOGIN, "timestamp": datetime(2024, 1, 3, 3, 15).isoformat()}]  # 3am
         
-        user_profile = {
-            "typical_countries": ["US", "CA"]
-        }
+        night_shift = {"typical_countries": ["US"], "typical_hours_mask": hours_mask(range(0, 6))}
+        day_shift = {"typical_countries": ["US"], "typical_hours_mask": hours_mask(range(9, 18))}
         
-        alert = detector.detect(logs, user_profile)
+        assert login_detector.detect(logs, night_shift) is None
         
+        alert = login_detector.detect(logs, day_shift)
         assert alert is not None
-        assert any(s.name == "anomalous_geography" for s in alert.signals)
+        signal = next(s for s in alert.signals if s.name == "unusual_time")
+        assert signal.description == "Login at 3:00, user typically active 9-18"
+    
+    def test_empty_typical_hours_flags_every_hour(self, login_detector):
+        """A profile with no typical hours treats any login time as unusual"""
+        logs = [{**BASE_LOGIN, "timestamp": datetime(2024, 1, 3, 14, 0).isoformat()}]
+        
+        for profile in ({"typical_hours": []}, {"typical_hours_mask": hours_mask([])}):
+            alert = login_detector.detect(logs, {"typical_countries": ["US"], **profile})
+            signal = next(s for s in alert.signals if s.name == "unusual_time")
+            assert signal.description == "Login at 14:00, user has no typical active hours"
     
-    def test_impossible_travel_detection(self):
+    def test_impossible_travel_detection(self, login_detector):
         """Should detect physically impossible travel"""
-        detector = SuspiciousLoginDetector()
-        
         # Login from US, then Russia 30 minutes later
-        base_time = datetime.now()
         logs = [
-            {
-                "timestamp": (base_time - timedelta(minutes=30)).isoformat(),
-                "user_id": "test-user",
-                "status": "success",
-                "ip": "1.2.3.4",
-                "country": "US",
-                "user_agent": "Chrome"
-            },
-            {
-                "timestamp": base_time.isoformat(),
-                "user_id": "test-user",
-                "status": "success",
-                "ip": "5.6.7.8",
-                "country": "RU",
-                "user_agent": "Chrome"
-            }
+            {**BASE_LOGIN, "timestamp": MINUTES_AGO[30]},
+            {**BASE_LOGIN, "ip": "5.6.7.8", "country": "RU", "timestamp": MINUTES_AGO[0]}
         ]
         
-        alert = detector.detect(logs)
+        alert = login_detector.detect(logs)
         
         assert alert is not None
         assert any(s.name == "impossible_travel" for s in alert.signals)
         assert alert.severity in [Severity.HIGH, Severity.CRITICAL]
     
-    def test_bot_user_agent_detection(self):
-        """Should detect headless browsers"""
-        detector = SuspiciousLoginDetector()
-        
+    def test_bot_user_agent_recorded_when_confidence_saturated(self, login_detector):
+        """The bot UA signal is kept as evidence even at full confidence"""
         logs = [{
-            "timestamp": datetime.now().isoformat(),
-            "user_id": "test-user",
+            **BASE_LOGIN,
+            "timestamp": MINUTES_AGO[0],
             "status": "failed",
-            "ip": "1.2.3.4",
-            "country": "US",
+            "country": "RU",
             "user_agent": "HeadlessChrome/91.0"
-        }]
+        } for _ in range(10)]
+        logs[-2] = {**logs[-2], "timestamp": MINUTES_AGO[1], "country": "US"}
         
-        alert = detector.detect(logs)
+        alert = login_detector.detect(logs, {"typical_countries": ["US"], "typical_hours": []})
         
-        assert alert is not None
+        assert alert.confidence == 100
         assert any(s.name == "bot_user_agent" for s in alert.signals)
-
-
+    
 class TestAbnormalAPIDetector:
     """Test API abuse detection"""
     
-    def test_rate_limiting_violation(self):
+    def test_rate_limiting_violation(self, api_detector):
         """Should detect excessive API calls"""
-        detector = AbnormalAPIDetector()
-        
         # 120 requests in last minute (above threshold of 100)
-        logs = []
-        for i in range(120):
-            logs.append({
-                "timestamp": (datetime.now() - timedelta(seconds=i)).isoformat(),
-                "user_id": "test-user",
-                "endpoint": "/api/v1/users",
-                "status": 200,
-                "ip": "1.2.3.4",
-                "params": ""
-            })
-        
-        alert = detector.detect(logs)
+        logs = [{**BASE_API_CALL, "timestamp": SECONDS_AGO[i]} for i in range(120)]
+        
+        alert = api_detector.detect(logs)
         
         assert alert is not None
         assert any(s.name == "rate_limit_violation" for s in alert.signals)
     
-    def test_sequential_id_enumeration(self):
+    def test_sequential_id_enumeration(self, api_detector):
         """Should detect bulk data extraction patterns"""
-        detector = AbnormalAPIDetector()
-        
-        # Sequential ID access
-        logs = []
-        for i in range(10):
-            logs.append({
-                "timestamp": (datetime.now() - timedelta(seconds=10-i)).isoformat(),
-                "user_id": "test-user",
-                "endpoint": f"/api/v1/users/{1000 + i}",
-                "status": 200,
-                "ip": "1.2.3.4",
-                "params": ""
-            })
-        
-        alert = detector.detect(logs)
+        # Sequential ID access, oldest first: IDs 1000-1009 from 10s to 1s ago
+        logs = [
+            {**BASE_API_CALL, "timestamp": timestamp, "endpoint": f"/api/v1/users/{resource_id}"}
+            for timestamp, resource_id in zip(SECONDS_AGO[10:0:-1], range(1000, 1010))
+        ]
+        
+        alert = api_detector.detect(logs)
         
         assert alert is not None
         assert any(s.name == "sequential_enumeration" for s in alert.signals)
     
-    def test_sql_injection_detection(self):
+    def test_sql_injection_detection(self, api_detector):
         """Should detect SQL injection attempts"""
-        detector = AbnormalAPIDetector()
-        
         logs = [{
+            **BASE_API_CALL,
             "timestamp": datetime.now().isoformat(),
-            "user_id": "test-user",
             "endpoint": "/api/v1/search",
             "status": 400,
-            "ip": "1.2.3.4",
             "params": "query=1' OR '1'='1"
         }]
         
-        alert = detector.detect(logs)
+        alert = api_detector.detect(logs)
         
         assert alert is not None
         assert any(s.name == "sql_injection_attempt" for s in alert.signals)
         assert alert.severity == Severity.CRITICAL
     
-    def test_privilege_escalation_detection(self):
-        """Should detect non-admin accessing admin endpoints"""
-        detector = AbnormalAPIDetector()
+    def test_sql_injection_reported_once_per_batch(self, api_detector):
+        """Repeated injection attempts in a batch should yield a single signal"""
+        logs = [{
+            **BASE_API_CALL,
+            "timestamp": datetime.now().isoformat(),
+            "endpoint": "/api/v1/search",
+            "status": 400,
+            "params": f"q={i} UNION SELECT password FROM users"
+        } for i in range(5)]
+        
+        alert = api_detector.detect(logs)
         
+        sql_signals = [s for s in alert.signals if s.name == "sql_injection_attempt"]
+        assert len(sql_signals) == 1
+        assert sql_signals[0].value == logs[0]["params"]
+    
+    def test_sql_scan_skipped_when_confidence_saturated(self, api_detector):
+        """Saturated alerts only check the current request's params"""
         logs = [{
+            **BASE_API_CALL,
+            "timestamp": datetime.now().isoformat(),
+            "endpoint": f"/api/admin/users/{i}",
+            "params": "q=1 UNION SELECT password FROM users" if i == 0 else "q=report"
+        } for i in range(101)]
+        profile = {"role": "user", "typical_endpoints": []}
+        
+        alert = api_detector.detect(logs, profile)
+        
+        assert alert.confidence == 100
+        assert alert.severity == Severity.CRITICAL
+        assert not any(s.name == "sql_injection_attempt" for s in alert.signals)
+        
+        logs[-1] = {**logs[-1], "params": "q=1 UNION SELECT password FROM users"}
+        alert = api_detector.detect(logs, profile)
+        
+        assert any(s.name == "sql_injection_attempt" for s in alert.signals)
+    
+    def test_privilege_escalation_detection(self, api_detector):
+        """Should detect non-admin accessing admin endpoints"""
+        logs = [{
+            **BASE_API_CALL,
             "timestamp": datetime.now().isoformat(),
-            "user_id": "test-user",
             "endpoint": "/admin/users/delete",
-            "status": 403,
-            "ip": "1.2.3.4",
-            "params": ""
+            "status": 403
         }]
         
         user_profile = {
             "role": "user"  # Not admin
         }
         
-        alert = detector.detect(logs, user_profile)
+        alert = api_detector.detect(logs, user_profile)
         
         assert alert is not None
         assert any(s.name == "privilege_escalation_attempt" for s in alert.signals)
@@ -223,10 +304,8 @@ class TestAbnormalAPIDetector:
 class TestPrivilegeEscalationDetector:
     """Test privilege escalation detection"""
     
-    def test_unauthorized_role_change(self):
+    def test_unauthorized_role_change(self, privilege_detector):
         """Should detect role changes without approval"""
-        detector = PrivilegeEscalationDetector()
-        
         logs = [{
             "timestamp": datetime.now().isoformat(),
             "user_id": "test-user",
@@ -237,16 +316,14 @@ class TestPrivilegeEscalationDetector:
             "ip": "1.2.3.4"
         }]
         
-        alert = detector.detect(logs)
+        alert = privilege_detector.detect(logs)
         
         assert alert is not None
         assert any(s.name == "unauthorized_role_change" for s in alert.signals)
         assert alert.severity in [Severity.HIGH, Severity.CRITICAL]
     
-    def test_service_account_misuse(self):
+    def test_service_account_misuse(self, privilege_detector):
         """Should detect service accounts used from external IPs"""
-        detector = PrivilegeEscalationDetector()
-        
         logs = [{
             "timestamp": datetime.now().isoformat(),
             "user_id": "svc-payments",  # Service account
@@ -254,15 +331,26 @@ class TestPrivilegeEscalationDetector:
             "ip": "203.0.113.1"  # External IP
         }]
         
-        alert = detector.detect(logs)
+        alert = privilege_detector.detect(logs)
         
         assert alert is not None
         assert any(s.name == "service_account_misuse" for s in alert.signals)
     
-    def test_iam_policy_expansion(self):
-        """Should detect IAM policies being expanded"""
-        detector = PrivilegeEscalationDetector()
+    def test_service_account_from_internal_network(self, privilege_detector):
+        """Service accounts inside the internal CIDR ranges are expected"""
+        logs = [{
+            "timestamp": datetime.now().isoformat(),
+            "user_id": "svc-payments",
+            "action": "login",
+            "ip": ip
+        } for ip in ("10.4.2.1", "172.31.255.254")]
         
+        alert = privilege_detector.detect(logs)
+        
+        assert alert is None
+    
+    def test_iam_policy_expansion(self, privilege_detector):
+        """Should detect IAM policies being expanded"""
         logs = [{
             "timestamp": datetime.now().isoformat(),
             "user_id": "test-user",
@@ -272,80 +360,140 @@ class TestPrivilegeEscalationDetector:
             "ip": "1.2.3.4"
         }]
         
-        alert = detector.detect(logs)
+        alert = privilege_detector.detect(logs)
         
         assert alert is not None
         assert any(s.name == "iam_privilege_expansion" for s in alert.signals)
 
 
+@pytest.fixture(scope="module")
+def extreme_login_logs():
+    """Extreme case with many signals: travel, failures, bot UA, new country"""
+    return [
+        {**BASE_LOGIN, "status": "failed", "timestamp": MINUTES_AGO[30]},
+        {**ATTACKER_LOGIN, "ip": "5.6.7.8", "timestamp": MINUTES_AGO[0]},
+    ] + [{**ATTACKER_LOGIN, "timestamp": MINUTES_AGO[i]} for i in range(10)]
+
+
 class TestConfidenceScoring:
     """Test confidence score calculation"""
     
-    def test_high_confidence_from_multiple_signals(self):
+    def test_high_confidence_from_multiple_signals(self, login_detector):
         """Multiple strong signals should result in high confidence"""
-        detector = SuspiciousLoginDetector()
-        
         # Failed logins + bot user agent + anomalous geography
-        logs = []
-        for i in range(6):
-            logs.append({
-                "timestamp": (datetime.now() - timedelta(minutes=i)).isoformat(),
-                "user_id": "test-user",
-                "status": "failed",
-                "ip": "1.2.3.4",
-                "country": "RU",
-                "user_agent": "HeadlessChrome/91.0"
-            })
+        logs = [{**ATTACKER_LOGIN, "timestamp": MINUTES_AGO[i]} for i in range(6)]
         
         user_profile = {
             "typical_countries": ["US"]
         }
         
-        alert = detector.detect(logs, user_profile)
+        alert = login_detector.detect(logs, user_profile)
         
         assert alert is not None
         assert alert.confidence >= 70  # High confidence
         assert len(alert.signals) >= 3  # Multiple signals
     
-    def test_confidence_capped_at_100(self):
+    def test_confidence_capped_at_100(self, login_detector, extreme_login_logs):
         """Confidence should never exceed 100"""
-        detector = SuspiciousLoginDetector()
+        alert = login_detector.detect(extreme_login_logs)
         
-        # Extreme case with many signals
-        base_time = datetime.now()
-        logs = [
-            {
-                "timestamp": (base_time - timedelta(minutes=30)).isoformat(),
-                "user_id": "test-user",
-                "status": "failed",
-                "ip": "1.2.3.4",
-                "country": "US",
-                "user_agent": "Chrome"
-            },
-            {
-                "timestamp": base_time.isoformat(),
-                "user_id": "test-user",
-                "status": "failed",
-                "ip": "5.6.7.8",
-                "country": "RU",
-                "user_agent": "HeadlessChrome/91.0"
-            }
+        assert alert is not None
+        assert alert.confidence <= 100
+
+
+class TestDetectionEngine:
+    """Test running all detectors over one batch"""
+    
+    def test_detector_without_detect_cannot_be_built(self):
+        class Incomplete(Detector):
+            pass
+        
+        with pytest.raises(TypeError):
+            Incomplete()
+    
+    def test_alerts_in_detector_order(self):
+        """Alerts come back in detector order"""
+        engine = DetectionEngine()
+        logs = [{
+            "timestamp": SECONDS_AGO[i],
+            "user_id": "svc-payments",
+            "status": "failed",
+            "ip": "203.0.113.1",
+            "endpoint": "/api/v1/search",
+            "params": "q=1 UNION SELECT secret",
+            "user_agent": "HeadlessChrome/91.0"
+        } for i in range(6)]
+        
+        alerts = engine.analyze(logs)
+        
+        assert [a.threat_type for a in alerts] == [
+            ThreatType.SUSPICIOUS_LOGIN,
+            ThreatType.ABNORMAL_API_USAGE,
+            ThreatType.PRIVILEGE_ESCALATION
         ]
+
+    
+    def test_analyze_stream_reuses_prepared_profile(self):
+        """Same profile object across batches should be prepared once"""
+        engine = DetectionEngine()
+        profile = {"user_id": "test-user", "typical_countries": ["US"], "typical_endpoints": ["/api/v1/search"]}
+        batches = [
+            ([{"timestamp": datetime.now().isoformat(), "user_id": "test-user",
+               "endpoint": "/api/v1/admin", "country": "US", "ip": "1.2.3.4"}], profile)
+            for _ in range(3)
+        ]
+        
+        results = list(engine.analyze_stream(batches))
+        
+        assert len(results) == 3
+        source, prepared = engine._profile_cache["test-user"]
+        assert source is profile
+        assert prepared["typical_endpoints"] == frozenset(["/api/v1/search"])
+        assert prepared["typical_hours_mask"] == hours_mask(range(9, 18))
+        assert all(any(s.name == "unusual_endpoint" for a in r for s in a.signals) for r in results)
+
+
+class TestTimestampParsing:
+    """Test one-time timestamp parsing shared across detectors"""
+    
+    def test_epochs_kept_in_columns(self):
+        """Parsed epochs live in LogColumns; input logs are not modified"""
+        now = datetime.now()
+        log = {"timestamp": now.isoformat()}
         
-        for i in range(10):
-            logs.append({
-                "timestamp": (base_time - timedelta(minutes=i)).isoformat(),
-                "user_id": "test-user",
-                "status": "failed",
-                "ip": "1.2.3.4",
-                "country": "RU",
-                "user_agent": "HeadlessChrome/91.0"
-            })
+        columns = LogColumns.from_logs([log])
         
-        alert = detector.detect(logs)
+        assert columns.timestamps[0] == pytest.approx(now.timestamp())
+        assert log_epoch(log) == pytest.approx(now.timestamp())
+        assert log == {"timestamp": now.isoformat()}
+    
+    def test_raw_logs_unchanged(self, login_detector):
+        logs = [{**ATTACKER_LOGIN, "timestamp": MINUTES_AGO[i]} for i in range(6)]
         
-        assert alert is not None
-        assert alert.confidence <= 100
+        alert = login_detector.detect(logs)
+        
+        assert alert.raw_logs[0] == {**ATTACKER_LOGIN, "timestamp": MINUTES_AGO[0]}
+    
+    def test_detectors_share_frozen_clock(self, login_detector):
+        """Detectors see the module's frozen now"""
+        logs = [{**BASE_LOGIN, "country": "RU", "timestamp": datetime.now().isoformat()}]
+        
+        alert = login_detector.detect(logs, {"typical_countries": ["US"]})
+        
+        assert alert.timestamp == FROZEN_NOW
+    
+    def test_window_counts(self):
+        """Vectorized window counts match a per-log scan"""
+        now = datetime.now()
+        logs = [
+            {"timestamp": (now - timedelta(minutes=i)).isoformat(), "status": "failed" if i % 2 else "success"}
+            for i in range(20)
+        ]
+        columns = LogColumns.from_logs(logs)
+        cutoff = (now - timedelta(minutes=10, seconds=30)).timestamp()
+        
+        assert columns.count_since(cutoff) == 11
+        assert columns.count_since(cutoff, columns.failed) == 5
 
 
 if __name__ == "__main__":
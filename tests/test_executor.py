@@ -1,208 +1,241 @@
 """
 Unit Tests for Action Executor Safety Mechanisms
 """
+import threading
+import time
 import pytest
-from datetime import timedelta
 from src.response.executor import (
     ActionExecutor,
     Action,
     ActionType,
     BlastRadius,
-    ExecutionStatus
+    ExecutionStatus,
+    Target,
+    generate_action_from_assessment
 )
+from types import SimpleNamespace
+
+
+def make_action(**overrides) -> Action:
+    """High-confidence, single-user IP block unless overridden"""
+    fields = dict(
+        action_id="test",
+        action_type=ActionType.BLOCK_IP,
+        target=Target(ip="1.2.3.4"),
+        confidence=95,
+        blast_radius=BlastRadius.SINGLE_USER,
+        reversible=True,
+        auto_expire=3600,
+        justification="Test",
+        metadata={}
+    )
+    fields.update(overrides)
+    return Action(**fields)
+
+
+@pytest.fixture
+def executor():
+    """Fresh executor for tests that fill rate windows or trip the breaker"""
+    return ActionExecutor()
+
+
+@pytest.fixture(scope="class")
+def class_executor():
+    return ActionExecutor()
+
+
+@pytest.fixture
+def shared_executor(class_executor):
+    """One executor per test class, reset to a clean state before each test"""
+    class_executor.reset()
+    return class_executor
 
 
 class TestSafetyChecks:
     """Test multi-layer safety mechanisms"""
     
-    def test_confidence_threshold_check(self):
-        """Actions below confidence threshold should escalate"""
-        executor = ActionExecutor()
-        
-        # Low confidence action
-        action = Action(
-            action_id="test-1",
-            action_type=ActionType.BLOCK_IP,
-            target={"ip": "1.2.3.4"},
-            confidence=50,  # Below threshold of 90
-            blast_radius=BlastRadius.SINGLE_USER,
-            reversible=True,
-            auto_expire=timedelta(hours=1),
-            justification="Low confidence test",
-            metadata={}
-        )
-        
-        result = executor.evaluate_action(action)
-        
-        assert result.status == ExecutionStatus.ESCALATED
-        assert "confidence" in result.reason.lower()
-    
-    def test_blast_radius_check(self):
-        """Multi-user actions should escalate regardless of confidence"""
-        executor = ActionExecutor()
-        
+    @pytest.mark.parametrize("overrides,trip_breaker,reason", [
+        # Below BLOCK_IP threshold of 90
+        ({"confidence": 50}, False, "confidence"),
         # High confidence but affects multiple users
-        action = Action(
-            action_id="test-2",
-            action_type=ActionType.BLOCK_IP,
-            target={"ip": "1.2.3.4"},
-            confidence=95,
-            blast_radius=BlastRadius.SERVICE,  # Not single user
-            reversible=True,
-            auto_expire=timedelta(hours=1),
-            justification="High blast radius test",
-            metadata={}
-        )
-        
-        result = executor.evaluate_action(action)
+        ({"blast_radius": BlastRadius.SERVICE}, False, "blast radius"),
+        # Protected executive
+        ({"action_type": ActionType.LOCK_ACCOUNT, "target": Target(user_id="exec-001"),
+          "reversible": False, "auto_expire": None}, False, "protected"),
+        # Even a high-confidence action escalates once the breaker trips
+        ({}, True, "circuit breaker"),
+    ], ids=["confidence_threshold", "blast_radius", "protected_entity", "circuit_breaker"])
+    def test_escalation_checks(self, overrides, trip_breaker, reason, executor):
+        """Each failed safety check should escalate with its own reason"""
+        if trip_breaker:
+            executor.trip_circuit_breaker("Test: High false positive rate")
+        
+        result = executor.evaluate_action(make_action(**overrides))
         
         assert result.status == ExecutionStatus.ESCALATED
-        assert "blast radius" in result.reason.lower()
+        assert reason in result.reason.lower()
     
-    def test_protected_entity_check(self):
-        """Protected entities should always escalate"""
-        executor = ActionExecutor()
-        
-        # Action targeting protected user
-        action = Action(
-            action_id="test-3",
-            action_type=ActionType.LOCK_ACCOUNT,
-            target={"user_id": "exec-001"},  # Protected executive
-            confidence=95,
-            blast_radius=BlastRadius.SINGLE_USER,
-            reversible=False,
+    def test_protected_entities_refresh(self, executor):
+        """Newly protected service accounts escalate after a refresh"""
+        action = make_action(
+            action_id="test-3-svc",
+            action_type=ActionType.REVOKE_SESSION,
+            target=Target(user_id="svc-billing"),
             auto_expire=None,
-            justification="Protected entity test",
-            metadata={}
+            justification="Protected entity test"
         )
         
+        executor.protected_entities["service_accounts"].add("svc-billing")
+        executor.refresh_protected_entities()
         result = executor.evaluate_action(action)
         
         assert result.status == ExecutionStatus.ESCALATED
         assert "protected" in result.reason.lower()
     
-    def test_rate_limit_check(self):
+    def test_rate_limit_check(self, executor):
         """Too many actions should be rejected"""
-        executor = ActionExecutor()
+        def nth_action(i):
+            return make_action(action_id=f"test-4-{i}", target=Target(ip=f"1.2.3.{i}"))
         
-        # Simulate many recent actions
-        for i in range(100):
-            executor.recent_actions.append({
-                "action_id": f"prev-{i}",
-                "timestamp": pytest.importorskip("datetime").datetime.now(),
-                "action_type": ActionType.RATE_LIMIT,
-                "target": {"ip": f"1.2.3.{i}"}
-            })
+        # Per-minute budget (10) is used up by back-to-back executions
+        for i in range(10):
+            assert executor.evaluate_action(nth_action(i)).status == ExecutionStatus.EXECUTED
         
         # This action should be rate limited
-        action = Action(
-            action_id="test-4",
-            action_type=ActionType.BLOCK_IP,
-            target={"ip": "1.2.3.4"},
-            confidence=95,
-            blast_radius=BlastRadius.SINGLE_USER,
-            reversible=True,
-            auto_expire=timedelta(hours=1),
-            justification="Rate limit test",
-            metadata={}
-        )
-        
-        result = executor.evaluate_action(action)
+        result = executor.evaluate_action(nth_action(10))
         
         assert result.status == ExecutionStatus.REJECTED
         assert "rate limit" in result.reason.lower()
     
-    def test_circuit_breaker_check(self):
-        """Circuit breaker should prevent all auto-actions"""
-        executor = ActionExecutor()
-        executor.trip_circuit_breaker("Test: High false positive rate")
-        
-        # Even high-confidence action should escalate
-        action = Action(
-            action_id="test-5",
-            action_type=ActionType.BLOCK_IP,
-            target={"ip": "1.2.3.4"},
-            confidence=95,
-            blast_radius=BlastRadius.SINGLE_USER,
-            reversible=True,
-            auto_expire=timedelta(hours=1),
-            justification="Circuit breaker test",
-            metadata={}
-        )
-        
-        result = executor.evaluate_action(action)
+    def test_rate_limit_weights_previous_window(self, executor):
+        """Half-way into the next minute, half of last minute's actions still count"""
+        def nth_action(i):
+            return make_action(action_id=f"test-4-{i}", target=Target(ip=f"1.2.3.{i}"))
+        
+        for i in range(10):
+            executor.evaluate_action(nth_action(i))
+        executor._rate_windows["per_minute"]["start"] -= 90
+        
+        # 10 * 0.5 carried over leaves room for 5 more
+        statuses = [executor.evaluate_action(nth_action(i)).status for i in range(10, 16)]
+        assert statuses == [ExecutionStatus.EXECUTED] * 5 + [ExecutionStatus.REJECTED]
+    
+    def test_concurrent_executions_respect_limit(self, executor):
+        """Concurrent callers can't all pass the check before any is counted"""
+        start = threading.Barrier(50)
+        
+        def slow_block(ip, duration):
+            time.sleep(0.01)
+        
+        executor._dispatch[ActionType.BLOCK_IP] = (slow_block, ("ip", "auto_expire"))
+        statuses = []
+        
+        def run(i):
+            start.wait()
+            statuses.append(executor.evaluate_action(
+                make_action(action_id=f"test-4-{i}", target=Target(ip=f"10.0.0.{i}"))
+            ).status)
+        
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert statuses.count(ExecutionStatus.EXECUTED) == 10
+        assert statuses.count(ExecutionStatus.REJECTED) == 40
+        assert executor._rate_windows["per_minute"]["curr"] == 10
+    
+    def test_failed_execution_releases_slot(self, executor):
+        """A reserved rate-limit slot is given back when the handler fails"""
+        result = executor.evaluate_action(make_action(target=Target(user_id="test-user")))
         
-        assert result.status == ExecutionStatus.ESCALATED
-        assert "circuit breaker" in result.reason.lower()
-
-
+        assert result.status == ExecutionStatus.FAILED
+        assert executor._rate_windows["per_minute"]["curr"] == 0
+        assert executor._rate_windows["per_hour"]["curr"] == 0
+    
+    def test_reset_clears_runtime_state(self, executor):
+        """reset() empties the rate windows and verdict cache and re-arms the breaker"""
+        for i in range(10):
+            executor.evaluate_action(make_action(action_id=f"test-4-{i}", target=Target(ip=f"1.2.3.{i}")))
+        executor.trip_circuit_breaker("Test")
+        
+        executor.reset()
+        
+        assert not executor.circuit_breaker_tripped
+        assert len(executor.verdict_cache) == 0
+        assert executor._rate_windows["per_minute"]["curr"] == 0
+        assert executor.evaluate_action(make_action(action_id="test-4-10")).status == ExecutionStatus.EXECUTED
+    
+    def test_dry_run_does_not_consume_rate_limit(self, executor):
+        """Only executed actions count against the rate limit"""
+        # Distinct targets so every dry run goes through the rate limit check
+        for i in range(20):
+            action = make_action(action_id=f"test-4-dry-{i}", target=Target(ip=f"1.2.4.{i}"))
+            assert executor.evaluate_action(action, dry_run=True).status == ExecutionStatus.APPROVED
+        
+        assert len(executor.verdict_cache) == 20
+        assert executor._rate_windows["per_minute"]["curr"] == 0
+        assert executor.evaluate_action(make_action(action_id="test-4-dry-20")).status == ExecutionStatus.EXECUTED
+    
 class TestActionExecution:
     """Test actual action execution"""
     
-    def test_successful_auto_execution(self):
+    def test_successful_auto_execution(self, shared_executor):
         """High confidence, low blast radius should auto-execute"""
-        executor = ActionExecutor()
-        
-        action = Action(
+        action = make_action(
             action_id="test-6",
-            action_type=ActionType.BLOCK_IP,
-            target={"ip": "1.2.3.4"},
-            confidence=95,
-            blast_radius=BlastRadius.SINGLE_USER,
-            reversible=True,
-            auto_expire=timedelta(hours=1),
-            justification="Auto-exec test",
-            metadata={}
+            justification="Auto-exec test"
         )
         
-        result = executor.evaluate_action(action)
+        result = shared_executor.evaluate_action(action)
         
         assert result.status == ExecutionStatus.EXECUTED
         assert result.executed_at is not None
         assert result.rollback_by is not None  # Has auto-expire
     
-    def test_dry_run_mode(self):
+    def test_dry_run_mode(self, shared_executor):
         """Dry run should not execute actions"""
-        executor = ActionExecutor()
-        
-        action = Action(
+        action = make_action(
             action_id="test-7",
             action_type=ActionType.LOCK_ACCOUNT,
-            target={"user_id": "test-user"},
-            confidence=95,
-            blast_radius=BlastRadius.SINGLE_USER,
+            target=Target(user_id="test-user"),
             reversible=False,
             auto_expire=None,
-            justification="Dry run test",
-            metadata={}
+            justification="Dry run test"
         )
         
-        result = executor.evaluate_action(action, dry_run=True)
+        result = shared_executor.evaluate_action(action, dry_run=True)
         
         assert result.status == ExecutionStatus.APPROVED
         assert result.executed_at is None  # Not actually executed
+    
+    def test_missing_target_entity_fails(self, shared_executor):
+        """An action without the entity its handler needs is reported as failed"""
+        action = make_action(
+            action_id="test-7-missing",
+            target=Target(user_id="test-user"),
+            justification="Missing target test"
+        )
+        
+        result = shared_executor.evaluate_action(action)
+        
+        assert result.status == ExecutionStatus.FAILED
+        assert "ip" in result.reason
 
 
 class TestHumanApproval:
     """Test human-in-the-loop workflow"""
     
-    def test_analyst_approval(self):
+    def test_analyst_approval(self, shared_executor):
         """Analyst can approve escalated actions"""
-        executor = ActionExecutor()
-        
-        action = Action(
+        action = make_action(
             action_id="test-8",
-            action_type=ActionType.BLOCK_IP,
-            target={"ip": "1.2.3.4"},
             confidence=75,  # Below auto-exec threshold
-            blast_radius=BlastRadius.SINGLE_USER,
-            reversible=True,
-            auto_expire=timedelta(hours=1),
-            justification="Human approval test",
-            metadata={}
+            justification="Human approval test"
         )
         
-        result = executor.human_approve(
+        result = shared_executor.human_approve(
             action,
             analyst_id="analyst-001",
             approved=True,
@@ -212,23 +245,15 @@ class TestHumanApproval:
         assert result.status == ExecutionStatus.EXECUTED
         assert result.analyst_id == "analyst-001"
     
-    def test_analyst_rejection(self):
+    def test_analyst_rejection(self, shared_executor):
         """Analyst can reject actions as false positives"""
-        executor = ActionExecutor()
-        
-        action = Action(
+        action = make_action(
             action_id="test-9",
-            action_type=ActionType.BLOCK_IP,
-            target={"ip": "1.2.3.4"},
             confidence=75,
-            blast_radius=BlastRadius.SINGLE_USER,
-            reversible=True,
-            auto_expire=timedelta(hours=1),
-            justification="False positive test",
-            metadata={}
+            justification="False positive test"
         )
         
-        result = executor.human_approve(
+        result = shared_executor.human_approve(
             action,
             analyst_id="analyst-001",
             approved=False,
@@ -243,11 +268,9 @@ class TestHumanApproval:
 class TestRollback:
     """Test action reversibility"""
     
-    def test_rollback_execution(self):
+    def test_rollback_execution(self, shared_executor):
         """Should be able to rollback actions"""
-        executor = ActionExecutor()
-        
-        result = executor.rollback(
+        result = shared_executor.rollback(
             action_id="test-10",
             reason="User verified legitimate, rolling back block"
         )
@@ -259,45 +282,171 @@ class TestRollback:
 class TestActionTypeThresholds:
     """Test different confidence thresholds for different action types"""
     
-    def test_log_only_always_executes(self):
+    def test_log_only_always_executes(self, shared_executor):
         """Log-only actions should always execute"""
-        executor = ActionExecutor()
-        
-        action = Action(
+        action = make_action(
             action_id="test-11",
             action_type=ActionType.LOG_ONLY,
-            target={"user_id": "test-user"},
+            target=Target(user_id="test-user"),
             confidence=10,  # Very low
-            blast_radius=BlastRadius.SINGLE_USER,
-            reversible=True,
             auto_expire=None,
-            justification="Log only test",
-            metadata={}
+            justification="Log only test"
         )
         
-        result = executor.evaluate_action(action)
+        result = shared_executor.evaluate_action(action)
         
         assert result.status == ExecutionStatus.EXECUTED
     
-    def test_high_severity_requires_high_confidence(self):
+    def test_high_severity_requires_high_confidence(self, shared_executor):
         """Account locks require very high confidence"""
-        executor = ActionExecutor()
-        
-        action = Action(
+        action = make_action(
             action_id="test-12",
             action_type=ActionType.LOCK_ACCOUNT,
-            target={"user_id": "test-user"},
+            target=Target(user_id="test-user"),
             confidence=90,  # Below threshold of 95
-            blast_radius=BlastRadius.SINGLE_USER,
             reversible=False,
             auto_expire=None,
-            justification="High severity test",
-            metadata={}
+            justification="High severity test"
         )
         
-        result = executor.evaluate_action(action)
+        result = shared_executor.evaluate_action(action)
+        
+        assert result.status == ExecutionStatus.ESCALATED
+    
+    def test_changed_threshold_takes_effect(self, executor):
+        """Thresholds change through set_auto_exec_threshold, never silently"""
+        action = make_action(action_id="test-13")
+        assert executor.evaluate_action(action, dry_run=True).status == ExecutionStatus.APPROVED
+        
+        executor.set_auto_exec_threshold(ActionType.BLOCK_IP, 99)
+        
+        result = executor.evaluate_action(action, dry_run=True)
+        assert result.status == ExecutionStatus.ESCALATED
+        assert "threshold 99" in result.reason
+        assert executor.evaluate_actions_batch([action], dry_run=True)[0].status == ExecutionStatus.ESCALATED
+        with pytest.raises(TypeError):
+            executor.auto_exec_thresholds[ActionType.BLOCK_IP] = 50
+
+
+class TestActionFromAssessment:
+    """Test mapping of recommendations to a primary action"""
+    
+    def action_for(self, recommendations, confidence):
+        alert = SimpleNamespace(
+            alert_id="alert-1",
+            affected_entities={"user_id": "user-1", "ip": "1.2.3.4"},
+            threat_type=SimpleNamespace(value="suspicious_login")
+        )
+        assessment = SimpleNamespace(
+            recommended_actions=tuple(recommendations),
+            risk_score=confidence,
+            reasoning="test",
+            attack_pattern="brute_force"
+        )
+        return generate_action_from_assessment(alert, assessment, "action-1")
+    
+    def test_highest_priority_recommendation_wins(self):
+        recommendations = ["Require MFA for next login", "Block IP address immediately"]
+        action = self.action_for(recommendations, 92)
+        
+        assert action.action_type == ActionType.BLOCK_IP
+        assert action.auto_expire == 3600
+    
+    def test_insufficient_confidence_falls_through(self):
+        recommendations = ["Lock affected account", "Rate limit IP address"]
+        
+        assert self.action_for(recommendations, 90).action_type == ActionType.RATE_LIMIT
+        assert self.action_for(["Lock affected account"], 90).action_type == ActionType.LOG_ONLY
+
+
+class TestBatchEvaluation:
+    """Test vectorized evaluation of action queues"""
+    
+    def make_actions(self):
+        cases = [
+            (ActionType.BLOCK_IP, 95, BlastRadius.SINGLE_USER, "user-1"),
+            (ActionType.BLOCK_IP, 60, BlastRadius.SINGLE_USER, "user-2"),  # Low confidence
+            (ActionType.REVOKE_SESSION, 90, BlastRadius.TEAM, "user-3"),  # Blast radius
+            (ActionType.LOCK_ACCOUNT, 99, BlastRadius.SINGLE_USER, "exec-001"),  # Protected
+            (ActionType.LOG_ONLY, 0, BlastRadius.SINGLE_USER, None),
+        ]
+        return [
+            make_action(
+                action_id=f"batch-{i}-{n}",
+                action_type=action_type,
+                target=Target(user_id=user_id, ip=f"10.0.{n}.{i}"),
+                confidence=confidence,
+                blast_radius=blast_radius,
+                auto_expire=None,
+                justification="Batch test"
+            )
+            for n in range(3)
+            for i, (action_type, confidence, blast_radius, user_id) in enumerate(cases)
+        ]
+    
+    def summarize(self, results):
+        return [(r.action_id, r.status, r.reason) for r in results]
+    
+    def test_matches_sequential_evaluation(self):
+        """Same statuses and reasons, including rate limiting partway through"""
+        actions = self.make_actions()
+        sequential = ActionExecutor()
+        sequential.action_rate_limits["per_minute"] = 4
+        batched = ActionExecutor()
+        batched.action_rate_limits["per_minute"] = 4
+        
+        expected = [sequential.evaluate_action(a) for a in actions]
+        results = batched.evaluate_actions_batch(actions)
+        
+        assert self.summarize(results) == self.summarize(expected)
+        assert ExecutionStatus.REJECTED in [r.status for r in results]
+    
+    def test_circuit_breaker_escalates_batch(self, executor):
+        executor.trip_circuit_breaker("Test")
+        
+        results = executor.evaluate_actions_batch(self.make_actions())
+        
+        assert {r.status for r in results} == {ExecutionStatus.ESCALATED}
+
+
+class TestVerdictCache:
+    """Test reuse of verdicts for duplicate proposals"""
+    
+    def test_duplicate_escalation_reused(self, executor):
+        first = executor.evaluate_action(make_action(action_id="dup-1", confidence=50))
+        second = executor.evaluate_action(make_action(action_id="dup-2", confidence=50))
+        
+        assert second.status == first.status == ExecutionStatus.ESCALATED
+        assert second.reason == first.reason
+        assert second.action_id == "dup-2"
+    
+    def test_executed_verdict_not_replayed(self, executor):
+        """A duplicate of an executed action is checked and executed on its own"""
+        first = executor.evaluate_action(make_action(action_id="dup-1"))
+        second = executor.evaluate_action(make_action(action_id="dup-2"))
+        
+        assert second.status == first.status == ExecutionStatus.EXECUTED
+        assert second.executed_at > first.executed_at
+        assert executor._rate_windows["per_minute"]["curr"] == 2
+        assert len(executor.verdict_cache) == 0
+    
+    def test_circuit_breaker_clears_cache(self, executor):
+        executor.evaluate_action(make_action(action_id="dup-1"), dry_run=True)
+        
+        executor.trip_circuit_breaker("Test")
+        result = executor.evaluate_action(make_action(action_id="dup-2"), dry_run=True)
         
         assert result.status == ExecutionStatus.ESCALATED
+    
+    def test_allowlist_refresh_clears_cache(self, executor):
+        action = make_action(action_id="dup-1", action_type=ActionType.REVOKE_SESSION,
+                             target=Target(user_id="svc-billing"), auto_expire=None)
+        assert executor.evaluate_action(action, dry_run=True).status == ExecutionStatus.APPROVED
+        
+        executor.protected_entities["service_accounts"].add("svc-billing")
+        executor.refresh_protected_entities()
+        
+        assert executor.evaluate_action(action, dry_run=True).status == ExecutionStatus.ESCALATED
 
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+"""
+Unit Tests for Queue-Based Logging Setup
+"""
+import logging
+import threading
+import pytest
+from src.logging_config import configure_logging, stop_logging
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        self.threads.add(threading.current_thread().name)
+
+
+class TestQueueLogging:
+    """Test that log I/O happens off the calling thread"""
+
+    def test_records_written_by_listener_thread(self):
+        handler = RecordingHandler()
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        try:
+            configure_logging(level=logging.INFO, format="%(levelname)s %(message)s", handlers=[handler])
+            logging.getLogger("src.agents.orchestrator").info("Investigation %s completed", "abc")
+            logging.getLogger("src.agents.orchestrator").debug("filtered out")
+            stop_logging()  # Drains the queue
+
+            assert handler.messages == ["INFO Investigation abc completed"]
+            assert threading.current_thread().name not in handler.threads
+        finally:
+            stop_logging()
+            root.handlers[:] = saved_handlers
+            root.setLevel(saved_level)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,43 @@
+"""
+Unit Tests for Agent Orchestrator
+"""
+import asyncio
+import pytest
+from src.agents.orchestrator import AgentOrchestrator
+
+
+class TestInvestigateMany:
+    """Test concurrent batch investigation"""
+
+    def test_results_in_alert_order(self, make_alert):
+        orchestrator = AgentOrchestrator()
+        alerts = [make_alert(f"user-{i}") for i in range(5)]
+
+        results = asyncio.run(orchestrator.investigate_many(alerts, dry_run=True))
+
+        assert [r["alert"] for r in results] == alerts
+
+    def test_concurrency_is_bounded(self, make_alert):
+        orchestrator = AgentOrchestrator(max_concurrency=2)
+        in_flight = peak = 0
+        investigate = orchestrator.investigate
+
+        async def tracked(alert, dry_run=False):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                await asyncio.sleep(0.01)
+                return await investigate(alert, dry_run=dry_run)
+            finally:
+                in_flight -= 1
+
+        orchestrator.investigate = tracked
+        alerts = [make_alert(f"user-{i}") for i in range(6)]
+        asyncio.run(orchestrator.investigate_many(alerts, dry_run=True))
+
+        assert peak == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,46 @@
+"""
+Unit Tests for sys.monitoring Profiler
+"""
+import asyncio
+import pytest
+from src.profiling import MONITORING_AVAILABLE, MonitoringProfiler
+
+
+pytestmark = pytest.mark.skipif(not MONITORING_AVAILABLE, reason="sys.monitoring needs Python 3.12+")
+
+
+async def investigate(delay):
+    await asyncio.sleep(delay)
+    return delay
+
+
+class TestMonitoringProfiler:
+    """Test event-based call timing"""
+
+    def test_times_concurrent_coroutines(self):
+        """Interleaved coroutine calls should each be timed start to finish"""
+        profiler = MonitoringProfiler(investigate)
+        profiler.enable()
+        try:
+            async def burst():
+                return await asyncio.gather(*[investigate(0.01) for _ in range(3)])
+            asyncio.run(burst())
+        finally:
+            profiler.disable()
+
+        stats = profiler.stats()["investigate"]
+        assert stats["calls"] == 3
+        assert stats["mean_ms"] >= 10
+
+    def test_no_events_when_disabled(self):
+        profiler = MonitoringProfiler(investigate)
+        profiler.enable()
+        profiler.disable()
+
+        asyncio.run(investigate(0))
+
+        assert profiler.stats() == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,55 @@
+"""
+Unit Tests for Threat Intel Blocklist
+"""
+import asyncio
+import pytest
+from src.agents.context import ContextAgent, MockStorageClient
+from src.agents.threat_intel import IPBlocklist
+
+
+class TestIPBlocklist:
+    """Test exact blocklist semantics"""
+
+    def test_membership_is_exact(self):
+        blocklist = IPBlocklist(["45.67.89.12", "45.67.89.12", "203.0.113.7"])
+
+        assert len(blocklist) == 2
+        assert "45.67.89.12" in blocklist
+        assert "203.0.113.7" in blocklist
+        assert "45.67.89.13" not in blocklist
+        assert "fd00::1" not in blocklist
+
+    def test_large_blocklist(self):
+        blocked = [f"10.0.{i // 256}.{i % 256}" for i in range(10_000)]
+        blocklist = IPBlocklist(blocked)
+
+        assert all(ip in blocklist for ip in blocked)
+        assert not any(f"192.168.{i // 256}.{i % 256}" in blocklist for i in range(10_000))
+
+    def test_malformed_addresses_ignored(self):
+        blocklist = IPBlocklist(["bogus", "", "2001:db8::zz"])
+
+        assert len(blocklist) == 0
+        assert "bogus" not in blocklist
+
+    def test_ipv6_entries_kept(self):
+        blocklist = IPBlocklist(["2001:DB8:0::1", "45.67.89.12"])
+
+        assert len(blocklist) == 2
+        assert "2001:db8::1" in blocklist
+        assert "2001:0db8:0000:0000:0000:0000:0000:0001" in blocklist
+        assert "2001:db8::2" not in blocklist
+        assert "45.67.89.12" in blocklist
+
+    def test_context_agent_flags_blocklisted_ip(self):
+        agent = ContextAgent(MockStorageClient(), blocklist=IPBlocklist(["45.67.89.12"]))
+
+        bad = asyncio.run(agent._check_threat_intelligence("45.67.89.12"))
+        clean = asyncio.run(agent._check_threat_intelligence("1.2.3.4"))
+
+        assert bad.on_blocklist and bad.reputation == "known_malicious"
+        assert not clean.on_blocklist and clean.reputation == "low_risk"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])